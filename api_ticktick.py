@@ -1,13 +1,636 @@
+import os
+import json
+import queue
+import time
+import uuid
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from liferpg.engine.save import SAVE_DIR, read_journal
+from liferpg.engine.task import Task
 
 BASE = "https://api.ticktick.com/open/v1"
 
+SYNC_STATE_FILE = os.path.join(SAVE_DIR, "ticktick_sync.json")
+LEDGER_FILE = os.path.join(SAVE_DIR, "ticktick_ledger.json")
+OUTBOX_FILE = os.path.join(SAVE_DIR, "ticktick_outbox.jsonl")
+
+PAGE_SIZE = 200
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+POLL_INTERVAL = 300
+POLL_JITTER = 0.2
+RATE_LIMIT = 1.0
+RATE_BURST = 10
+
+PUSH_BATCH = 50
+PUSH_WORKERS = 4
+
+
+class TickTickError(Exception):
+    def __init__(self, status, message):
+        super().__init__(f"TickTick API error {status}: {message}")
+        self.status = status
+
+
+# -------------------------
+# Connection Pool
+# -------------------------
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Process-wide pooled session, so every call reuses kept-alive connections.
+    """
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+# -------------------------
+# Rate Limit
+# -------------------------
+
+class TokenBucket:
+    """
+    Allows `rate` requests per second on average, with bursts of up to
+    `capacity`. Shared by every thread that holds it.
+    """
+
+    def __init__(self, rate=RATE_LIMIT, capacity=RATE_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, stop=None):
+        """
+        Blocks until a token is available. Returns False if `stop` (an
+        Event) is set while waiting.
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+
+                wait = (1 - self.tokens) / self.rate
+
+            if stop is None:
+                time.sleep(wait)
+            elif stop.wait(wait):
+                return False
+
+
+# -------------------------
+# Client
+# -------------------------
+
+class TickTickClient:
+    """
+    Thin API client. Retries 429 and 5xx with exponential backoff and
+    jitter, honouring Retry-After when the server sends one.
+    """
+
+    def __init__(self, token, base=BASE, session=None,
+                 retries=5, backoff=0.5, timeout=30, limiter=None):
+        self.token = token
+        self.base = base.rstrip("/")
+        self.session = session or get_session()
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.limiter = limiter
+
+    def request(self, method, path, **kwargs):
+        headers = kwargs.pop("headers", {})
+        headers["Authorization"] = f"Bearer {self.token}"
+
+        for attempt in range(self.retries + 1):
+            if self.limiter is not None:
+                self.limiter.acquire()
+
+            try:
+                r = self.session.request(
+                    method,
+                    f"{self.base}{path}",
+                    headers=headers,
+                    timeout=self.timeout,
+                    **kwargs
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+                time.sleep(self._delay(attempt))
+                continue
+
+            if r.status_code in RETRY_STATUSES and attempt < self.retries:
+                time.sleep(self._delay(attempt, r.headers.get("Retry-After")))
+                continue
+
+            if not 200 <= r.status_code < 300:
+                raise TickTickError(r.status_code, r.text)
+
+            return r
+
+    def _delay(self, attempt, retry_after=None):
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self.backoff * (2 ** attempt) * (0.5 + random.random())
+
+    def query_tasks(self, modified_since=None, page_size=PAGE_SIZE):
+        """
+        Yields tasks page by page, optionally only those modified after
+        `modified_since`.
+        """
+        cursor = None
+
+        while True:
+            body = {"limit": page_size}
+            if modified_since:
+                body["modifiedSince"] = modified_since
+            if cursor:
+                body["cursor"] = cursor
+
+            page = self.request("POST", "/task/query", json=body).json()
+
+            for task in page.get("tasks", []):
+                yield task
+
+            cursor = page.get("nextCursor")
+            if not cursor:
+                return
+
+
+    def complete_task(self, task_id, project_id=None, idempotency_key=None):
+        if project_id:
+            path = f"/project/{project_id}/task/{task_id}/complete"
+        else:
+            path = f"/task/{task_id}/complete"
+
+        headers = {}
+        if idempotency_key:
+            headers["Idempotency-Key"] = idempotency_key
+
+        return self.request("POST", path, headers=headers)
+
+
 def fetch_tasks(token):
-    r = requests.post(
-        f"{BASE}/task/query",
-        headers={"Authorization": f"Bearer {token}"},
-        json={}
+    return list(TickTickClient(token).query_tasks())
+
+
+# -------------------------
+# Incremental Sync
+# -------------------------
+
+class SyncEngine:
+    """
+    Incremental sync: remembers the newest modifiedTime seen and only
+    asks for tasks changed since then. The cursor is only persisted by
+    commit(), once the caller has applied what sync() returned, so a
+    sync that is interrupted or fails to apply is simply repeated.
+    """
+
+    def __init__(self, client, state_file=SYNC_STATE_FILE):
+        self.client = client
+        self.state_file = state_file
+        self.state = {"modified_since": None}
+
+        # cursor reached by the last fully consumed sync()
+        self.cursor = None
+
+        if os.path.exists(state_file):
+            try:
+                with open(state_file, "r", encoding="utf-8") as f:
+                    self.state.update(json.load(f))
+            except (OSError, ValueError):
+                pass
+
+    def sync(self, full=False):
+        """
+        Yields tasks changed since the last committed sync, or every task
+        when `full`. Once consumed, `cursor` holds the value to commit().
+        """
+        newest = self.state["modified_since"]
+        since = None if full else newest
+
+        for task in self.client.query_tasks(modified_since=since):
+            modified = task.get("modifiedTime")
+            if modified and (newest is None or modified > newest):
+                newest = modified
+            yield task
+
+        self.cursor = newest
+
+    def commit(self, cursor=None):
+        self.state["modified_since"] = cursor if cursor is not None else self.cursor
+        self.save()
+
+    def reset(self):
+        self.state["modified_since"] = None
+        self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+        tmp = self.state_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.state_file)
+
+
+# -------------------------
+# Import Into Engine
+# -------------------------
+
+STATUS_COMPLETED = 2
+
+# TickTick priority: 0 none, 1 low, 3 medium, 5 high
+PRIORITY_DIFFICULTY = {
+    0: "easy",
+    1: "easy",
+    3: "medium",
+    5: "hard"
+}
+
+DIFFICULTY_TAGS = ("boss", "hard", "medium", "easy")
+
+
+# dueDate is documented as 2019-11-13T03:00:00+0000; other fields carry
+# milliseconds
+TIME_FORMATS = ("%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%dT%H:%M:%S.%f%z")
+
+
+def parse_time(value):
+    if not value:
+        return None
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    return None
+
+
+def to_task(item):
+    tags = {t.lower() for t in item.get("tags") or []}
+    difficulty = next(
+        (tag for tag in DIFFICULTY_TAGS if tag in tags),
+        PRIORITY_DIFFICULTY.get(item.get("priority", 0), "easy")
     )
-    if r.status_code != 200:
-        raise Exception(r.text)
-    return r.json().get("tasks", [])
+    task = Task(item["id"], item.get("title", ""), difficulty)
+    task.project_id = item.get("projectId")
+    task.due = parse_time(item.get("dueDate"))
+    return task
+
+
+class TaskImporter:
+    """
+    Applies TickTick tasks to a Player. Newly completed tasks go through
+    one complete_tasks batch, newly overdue ones through fail_task. Ids
+    already processed are kept in a persisted ledger of sets, so a
+    re-sync costs one set lookup per task.
+
+    The importer also keeps the set of open tasks, so tasks that go
+    overdue without being modified (and so never come back from an
+    incremental sync) are still failed.
+    """
+
+    def __init__(self, player, ledger_file=LEDGER_FILE):
+        self.player = player
+        self.ledger_file = ledger_file
+        self.rewarded = set()
+        self.failed = set()
+
+        # id -> Task still open in TickTick
+        self.open_tasks = {}
+
+        if os.path.exists(ledger_file):
+            try:
+                with open(ledger_file, "r", encoding="utf-8") as f:
+                    ledger = json.load(f)
+                self.rewarded = set(ledger.get("rewarded", []))
+                self.failed = set(ledger.get("failed", []))
+            except (OSError, ValueError):
+                pass
+
+    def import_tasks(self, items, now=None, full=False):
+        """
+        Consumes an iterable of TickTick task dicts (e.g. SyncEngine.sync())
+        and returns (completed, failed, pending) engine Tasks, pending
+        being every task still open. With full=True the items are a
+        complete listing and replace the open set instead of updating it.
+        """
+        now = now or datetime.now(timezone.utc)
+        completed = {}
+        open_tasks = {} if full else dict(self.open_tasks)
+
+        for item in items:
+            tid = item["id"]
+            open_tasks.pop(tid, None)
+
+            if item.get("status") == STATUS_COMPLETED:
+                if tid not in self.rewarded:
+                    completed[tid] = to_task(item)
+            elif tid not in self.rewarded:
+                open_tasks[tid] = to_task(item)
+
+        # checked over the whole open set, not just what changed
+        failed = []
+        for tid, task in list(open_tasks.items()):
+            if task.due is not None and task.due < now:
+                del open_tasks[tid]
+                if tid not in self.failed:
+                    failed.append(task)
+
+        completed = list(completed.values())
+
+        if completed or failed:
+            with self.player.transaction("ticktick_import"):
+                self.player.complete_tasks(completed)
+                for task in failed:
+                    self.player.fail_task(task)
+
+            # only once the player has them, or a failed batch is never paid
+            self.rewarded.update(task.id for task in completed)
+            self.failed.update(task.id for task in failed)
+
+            self.player.flush()
+            self.save()
+
+        self.open_tasks = open_tasks
+        return completed, failed, list(open_tasks.values())
+
+    def complete_local(self, task):
+        """
+        Completes a TickTick task from inside the app. Returns False if it
+        was already rewarded.
+        """
+        if task.id in self.rewarded:
+            return False
+
+        self.player.complete_task(task)
+        self.rewarded.add(task.id)
+        self.open_tasks.pop(task.id, None)
+
+        self.player.flush()
+        self.save()
+        return True
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.ledger_file), exist_ok=True)
+        tmp = self.ledger_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "rewarded": sorted(self.rewarded),
+                "failed": sorted(self.failed)
+            }, f)
+        os.replace(tmp, self.ledger_file)
+
+
+# -------------------------
+# Outbound Completions
+# -------------------------
+
+class CompletionQueue:
+    """
+    Durable outbox of completions made in the app. Each completion is
+    appended (and fsynced) with its own idempotency key before it is
+    pushed, and acknowledged in the same file once TickTick accepts it,
+    so completions made offline or before a crash are pushed later and
+    a retried push cannot complete a task twice.
+    """
+
+    def __init__(self, client, path=OUTBOX_FILE, batch_size=PUSH_BATCH,
+                 workers=PUSH_WORKERS):
+        self.client = client
+        self.path = path
+        self.batch_size = batch_size
+        self.workers = workers
+
+        # idempotency key -> entry, in recording order
+        self.entries = {}
+        self.lock = threading.Lock()
+        self._flushing = threading.Lock()
+
+        for record in read_journal(path):
+            if record.get("op") == "ack":
+                self.entries.pop(record["key"], None)
+            else:
+                self.entries[record["key"]] = record
+
+        self._rewrite()
+
+    def record(self, task):
+        entry = {
+            "op": "complete",
+            "key": uuid.uuid4().hex,
+            "task_id": task.id,
+            "project_id": getattr(task, "project_id", None),
+            "completed_at": time.time()
+        }
+
+        with self.lock:
+            self._append([entry])
+            self.entries[entry["key"]] = entry
+
+        return entry["key"]
+
+    def pending(self):
+        with self.lock:
+            return list(self.entries.values())
+
+    def flush(self):
+        """
+        Pushes queued completions in batches over the pooled session.
+        Stops at the first batch that cannot be delivered (e.g. offline)
+        and leaves the rest queued. Returns how many were pushed.
+        """
+        pushed = 0
+
+        with self._flushing, ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                batch = self.pending()[:self.batch_size]
+                if not batch:
+                    break
+
+                results = list(pool.map(self._push, batch))
+                done = [entry["key"] for entry, ok in zip(batch, results) if ok]
+
+                with self.lock:
+                    self._append([{"op": "ack", "key": key} for key in done])
+                    for key in done:
+                        self.entries.pop(key, None)
+
+                    if not self.entries:
+                        self._rewrite()
+
+                pushed += len(done)
+                if len(done) < len(batch):
+                    break
+
+        return pushed
+
+    def _push(self, entry):
+        try:
+            self.client.complete_task(
+                entry["task_id"],
+                entry.get("project_id"),
+                idempotency_key=entry["key"]
+            )
+        except TickTickError as e:
+            # the task is gone or not ours; retrying will never help
+            return e.status in (400, 403, 404, 410)
+        except requests.RequestException:
+            return False
+        return True
+
+    def _append(self, records):
+        if not records:
+            return
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _rewrite(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+
+# -------------------------
+# Background Poller
+# -------------------------
+
+class TickTickPoller:
+    """
+    Polls TickTick on its own thread every `interval` seconds (+/- jitter)
+    and hands each sync to the engine as one command, so a poll costs one
+    complete_tasks batch and one UI refresh however many tasks changed.
+
+    Completions made in the app are queued in `outbox` and pushed ahead
+    of each poll. Open tasks and errors are posted to `updates` for the
+    UI to drain.
+    """
+
+    def __init__(self, client, engine, interval=POLL_INTERVAL, jitter=POLL_JITTER,
+                 outbox=None):
+        self.client = client
+        self.engine = engine
+        self.interval = interval
+        self.jitter = jitter
+        self.sync_engine = SyncEngine(client)
+        self.outbox = outbox if outbox is not None else CompletionQueue(client)
+        self.updates = queue.Queue()
+
+        # only touched on the engine thread
+        self.importer = None
+
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ticktick-poller", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def wake(self):
+        self._wake.set()
+
+    def poll_now(self, full=False):
+        """
+        Pushes queued completions, then fetches changes (everything when
+        `full`); runs on the caller's thread. The sync cursor is only
+        committed once the engine has applied the batch.
+        """
+        self.outbox.flush()
+
+        items = list(self.sync_engine.sync(full))
+
+        # submitted even when nothing changed: open tasks may go overdue
+        self.engine.submit(self.apply, items, self.sync_engine.cursor, full)
+
+    def _run(self):
+        delay = 0
+
+        # the open set is only kept in memory, so rebuild it from one
+        # full listing per run; unchanged tasks never show up otherwise
+        full = True
+
+        while True:
+            self._wake.wait(delay)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+
+            try:
+                self.poll_now(full)
+                full = False
+            except (TickTickError, requests.RequestException) as e:
+                self.updates.put(("error", f"TickTick sync failed: {e}"))
+
+            delay = self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def apply(self, player, items, cursor, full=False):
+        """
+        Engine-thread half of a poll: imports the batch into the player,
+        then commits the sync cursor.
+        """
+        if self.importer is None or self.importer.player is not player:
+            self.importer = TaskImporter(player)
+
+        _, _, pending = self.importer.import_tasks(items, full=full)
+        self.sync_engine.commit(cursor)
+        self.updates.put(("tasks", pending))
+
+    def complete(self, player, task):
+        """
+        Engine-thread command for a task completed in the app: queues the
+        push, rewards it once and wakes the poller to send it. The push is
+        recorded first; if the reward is then lost, the next sync sees the
+        task completed and pays it.
+        """
+        if self.importer is None or self.importer.player is not player:
+            self.importer = TaskImporter(player)
+
+        if task.id not in self.importer.rewarded:
+            self.outbox.record(task)
+            self.wake()
+            self.importer.complete_local(task)
+
+        self.updates.put(("tasks", list(self.importer.open_tasks.values())))
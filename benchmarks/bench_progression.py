@@ -0,0 +1,44 @@
+"""
+Per-call cost of rank resolution from rank 1 to rank 500.
+
+    python benchmarks/bench_progression.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from liferpg.engine.progression import TABLE, ranks_for, resolve_rank, xp_required_for_rank
+
+
+def linear_resolve(total):
+    rank = 1
+    remaining = total
+    while remaining >= xp_required_for_rank(rank):
+        remaining -= xp_required_for_rank(rank)
+        rank += 1
+    return rank, remaining, xp_required_for_rank(rank)
+
+
+def main():
+    while len(TABLE.thresholds) < 500:
+        TABLE.rank_for(TABLE.thresholds[-1])
+
+    print(f"{'rank':>6} {'table (us)':>12} {'linear (us)':>12}")
+    for rank in (1, 10, 50, 100, 250, 500):
+        total = TABLE.thresholds[rank - 2] if rank > 1 else 0
+        assert resolve_rank(total) == linear_resolve(total)
+
+        n = 20000
+        table = timeit.timeit(lambda: resolve_rank(total), number=n) / n * 1e6
+        linear = timeit.timeit(lambda: linear_resolve(total), number=200) / 200 * 1e6
+        print(f"{rank:>6} {table:>12.3f} {linear:>12.3f}")
+
+    totals = TABLE.thresholds[:500] * 20
+    batched = timeit.timeit(lambda: ranks_for(totals), number=20) / 20 / len(totals) * 1e6
+    print(f"batched ranks_for: {batched:.3f} us/total over {len(totals)} totals")
+
+
+if __name__ == "__main__":
+    main()
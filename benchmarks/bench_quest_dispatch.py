@@ -0,0 +1,84 @@
+"""
+Quest event cost with 10k archived quests and 50 active ones.
+
+    python benchmarks/bench_quest_dispatch.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from liferpg.engine.objective import Objective
+from liferpg.engine.quest import Quest
+from liferpg.engine.quest_manager import QuestManager
+from liferpg.engine.task import Task
+
+
+class StubPlayer:
+    def __init__(self, quests):
+        self.data = {"credits": 0, "quests": quests}
+
+    def _apply_navigation_data(self, amount):
+        pass
+
+    def save(self, event=None):
+        pass
+
+
+def make_quest(qid, status):
+    quest = Quest(
+        qid, qid, "",
+        [
+            Objective("tasks", "complete_task", 10 ** 9),
+            Objective("nav", "accumulate_navigation_data", 10 ** 9),
+        ],
+        {"credits": 1, "_applied": status == "completed"}
+    )
+    quest.status = status
+    if status == "completed":
+        for obj in quest.objectives:
+            obj.completed = True
+    return quest
+
+
+def build(archived, active):
+    quests = {}
+    for i in range(archived):
+        quests[f"old_{i}"] = make_quest(f"old_{i}", "completed").to_dict()
+    for i in range(active):
+        quests[f"new_{i}"] = make_quest(f"new_{i}", "active").to_dict()
+    return QuestManager(StubPlayer(quests))
+
+
+def fan_out(manager, task):
+    # pre-index behaviour: visit every quest and objective, then
+    # re-serialize the whole quest log on each save
+    for quest in manager.quests.values():
+        quest.notify_task_completed(task)
+    {qid: q.to_dict() for qid, q in manager.quests.items()}
+
+    for quest in manager.quests.values():
+        quest.notify_navigation_data(10)
+    {qid: q.to_dict() for qid, q in manager.quests.items()}
+
+
+def main():
+    task = Task(1, "bench")
+    n = 200
+
+    print(f"{'archived':>9} {'indexed (us)':>13} {'fan-out (us)':>13}")
+    for archived in (0, 1000, 10000):
+        manager = build(archived, 50)
+
+        def indexed():
+            manager.notify_task_completed(task)
+            manager.notify_navigation_data(10)
+
+        per_event = timeit.timeit(indexed, number=n) / n * 1e6
+        legacy = timeit.timeit(lambda: fan_out(manager, task), number=n) / n * 1e6
+        print(f"{archived:>9} {per_event:>13.1f} {legacy:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Save/load latency and on-disk size per save codec, for a fresh profile
+and for one carrying 100k quest records.
+
+    python benchmarks/bench_save_codecs.py
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp())
+
+from liferpg.engine.save import CODECS, read_snapshot, write_snapshot, _write_atomic
+from liferpg.engine.schema import new_player
+
+
+def large_profile(quests):
+    data = new_player()
+    for i in range(quests):
+        qid = f"quest_{i}"
+        data["quests"][qid] = {
+            "id": qid,
+            "name": f"Quest {i}",
+            "description": "Complete 3 tasks and earn 100 navigation data.",
+            "status": "completed",
+            "objectives": [
+                {"id": "obj_tasks", "type": "complete_task",
+                 "target": 3, "current": 3, "completed": True},
+                {"id": "obj_nav", "type": "accumulate_navigation_data",
+                 "target": 100, "current": 100, "completed": True},
+            ],
+            "rewards": {"navigation_data": 150, "credits": 100, "_applied": True},
+        }
+    return data
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    path = os.path.abspath("player.bench")
+
+    for label, data, repeat in (
+        ("fresh profile", new_player(), 50),
+        ("100k quests", large_profile(100_000), 3),
+    ):
+        print(f"\n{label}")
+        print(f"{'codec':>16} {'save ms':>10} {'load ms':>10} {'size KiB':>10}")
+
+        def legacy():
+            _write_atomic(path, json.dumps(data, indent=4).encode("utf-8"))
+
+        rows = [("json indent=4", legacy)]
+        rows += [(name, lambda name=name: write_snapshot(data, path, name)) for name in CODECS]
+
+        for name, save in rows:
+            save_ms = timed(save, repeat)
+            load_ms = timed(lambda: read_snapshot(path), repeat)
+            assert read_snapshot(path) == data
+            size = os.path.getsize(path) / 1024
+            print(f"{name:>16} {save_ms:>10.2f} {load_ms:>10.2f} {size:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Randomized parity check: Player.complete_tasks(tasks) must end in the
+same state, and pay quest rewards in the same order, as calling
+complete_task(task) for each task in turn.
+
+    python benchmarks/check_batch_parity.py [seeds]
+"""
+import os
+import sys
+import copy
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from liferpg.engine.player import Player
+from liferpg.engine.schema import new_player
+from liferpg.engine.task import Task
+
+DIFFICULTIES = ("easy", "medium", "hard", "boss")
+OBJECTIVE_TYPES = ("complete_task", "accumulate_navigation_data")
+
+
+class MemoryStore:
+    def __init__(self, data):
+        self.data = data
+
+    def load(self, profile_id):
+        return copy.deepcopy(self.data)
+
+    def save(self, profile_id, data):
+        pass
+
+
+def random_objective(rng, oid):
+    kind = rng.choice(OBJECTIVE_TYPES)
+    target = rng.randint(1, 8) if kind == "complete_task" else rng.randint(1, 400)
+    current = rng.randint(0, target)
+    return {
+        "id": oid,
+        "type": kind,
+        "target": target,
+        "current": current,
+        "completed": current >= target
+    }
+
+
+def random_player(rng):
+    data = new_player()
+    data["total_navigation_data"] = rng.randint(0, 5000)
+
+    for i in range(rng.randint(0, 8)):
+        qid = f"q{i}"
+        objectives = [random_objective(rng, f"o{j}") for j in range(rng.randint(0, 3))]
+        status = rng.choice(("active", "active", "active", "locked", "completed"))
+
+        rewards = {}
+        if rng.random() < 0.8:
+            rewards["navigation_data"] = rng.randint(0, 300)
+        if rng.random() < 0.5:
+            rewards["credits"] = rng.randint(0, 100)
+        if status == "completed":
+            for obj in objectives:
+                obj["current"], obj["completed"] = obj["target"], True
+            rewards["_applied"] = rng.random() < 0.5
+
+        data["quests"][qid] = {
+            "id": qid,
+            "name": qid,
+            "description": "",
+            "status": status,
+            "objectives": objectives,
+            "rewards": rewards
+        }
+
+    return data
+
+
+def run(data, tasks, batched):
+    player = Player(journal=False, store=MemoryStore(data))
+    rewards = []
+
+    mark_dirty = player.saver.mark_dirty
+
+    def record(state, event=None):
+        if event and event.startswith("quest_reward:"):
+            rewards.append(event)
+        mark_dirty(state, event)
+
+    player.saver.mark_dirty = record
+
+    if batched:
+        player.complete_tasks(tasks)
+    else:
+        for task in tasks:
+            player.complete_task(task)
+
+    return player.data, rewards
+
+
+def check(seed):
+    rng = random.Random(seed)
+    data = random_player(rng)
+    tasks = [Task(i, f"t{i}", rng.choice(DIFFICULTIES)) for i in range(rng.randint(0, 12))]
+
+    sequential = run(data, tasks, batched=False)
+    batched = run(data, tasks, batched=True)
+    return sequential == batched
+
+
+def main():
+    seeds = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+
+    failures = [seed for seed in range(seeds) if not check(seed)]
+
+    if failures:
+        print(f"{len(failures)}/{seeds} seeds differ, e.g. {failures[:10]}")
+        sys.exit(1)
+
+    print(f"complete_tasks matches sequential complete_task on {seeds} seeds")
+
+
+if __name__ == "__main__":
+    main()
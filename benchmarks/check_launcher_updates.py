@@ -0,0 +1,351 @@
+"""
+Update-path checks for the launcher against a local stand-in for the
+GitHub release API and asset downloads (with Range, If-Range and ETag
+support), so nothing touches the network or a real install.
+
+    python benchmarks/check_launcher_updates.py
+"""
+import os
+import io
+import re
+import sys
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+import zipfile
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORK = tempfile.mkdtemp(prefix="liferpg-launcher-")
+
+
+# -------------------------
+# Stand-in server
+# -------------------------
+
+class ReleaseServer:
+    """
+    Serves the latest release JSON and its assets from memory. Records
+    every request, and can cut a download short once to test resume.
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.release = None
+        self.requests = []
+        self.cut_next = None    # (path, bytes) to send before dropping
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.handle(self)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def publish(self, version, files):
+        """
+        files: {member name: bytes}. Publishes the full zip and manifest.
+        """
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+            for name, data in files.items():
+                z.writestr(name, data)
+
+        manifest = {
+            "files": {name: hashlib.sha256(data).hexdigest() for name, data in files.items()}
+        }
+
+        assets = []
+        for i, (name, data) in enumerate((
+            ("LifeRPG_full.zip", buf.getvalue()),
+            ("manifest.json", json.dumps(manifest).encode("utf-8")),
+        )):
+            path = f"/download/v{version}/{name}"
+            self.files[path] = data
+            assets.append({
+                "id": version * 10 + i,
+                "name": name,
+                "updated_at": f"v{version}",
+                "browser_download_url": self.base + path,
+            })
+
+        self.release = {"tag_name": f"v{version}", "assets": assets}
+
+    def handle(self, req):
+        headers = dict(req.headers.items())
+        self.requests.append((req.path, headers.get("Range")))
+
+        if req.path.startswith("/repos/"):
+            body = json.dumps(self.release).encode("utf-8")
+            etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+            if headers.get("If-None-Match") == etag:
+                req.send_response(304)
+                req.end_headers()
+                return
+            self.send(req, 200, body, {"ETag": etag})
+            return
+
+        data = self.files.get(req.path)
+        if data is None:
+            req.send_response(404)
+            req.end_headers()
+            return
+
+        etag = '"%s"' % hashlib.sha256(data).hexdigest()[:16]
+        extra = {"ETag": etag}
+
+        rng = headers.get("Range")
+        if_range = headers.get("If-Range")
+        if rng and (if_range is None or if_range == etag):
+            start, end = re.match(r"bytes=(\d*)-(\d*)", rng).groups()
+            if start == "":
+                start, end = max(len(data) - int(end), 0), len(data) - 1
+            else:
+                start, end = int(start), min(int(end), len(data) - 1) if end else len(data) - 1
+
+            if start >= len(data):
+                req.send_response(416)
+                req.end_headers()
+                return
+
+            extra["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+            self.send(req, 206, data[start:end + 1], extra)
+            return
+
+        self.send(req, 200, data, extra)
+
+    def send(self, req, status, body, headers):
+        req.send_response(status)
+        for name, value in headers.items():
+            req.send_header(name, value)
+        req.send_header("Content-Length", str(len(body)))
+        req.end_headers()
+
+        cut = self.cut_next
+        if cut and cut[0] == req.path:
+            self.cut_next = None
+            req.wfile.write(body[:cut[1]])
+            req.wfile.flush()
+            req.close_connection = True
+            return
+
+        req.wfile.write(body)
+
+    def range_requests(self, name):
+        return [r for p, r in self.requests if p.endswith(name) and r]
+
+
+SERVER = ReleaseServer()
+
+# both read at import
+os.environ["APPDATA"] = os.path.join(WORK, "appdata")
+os.environ["LIFERPG_RELEASE_API"] = SERVER.base
+
+import bootstrap  # noqa: E402
+
+
+# -------------------------
+# Headless launcher
+# -------------------------
+
+class HeadlessLauncher(bootstrap.Launcher):
+    """
+    The launcher's update logic without a Tk window: actions and UI
+    calls run inline and log lines are kept in a list.
+    """
+
+    def __init__(self, install_dir):
+        self.cfg = bootstrap.load_config()
+        self.cfg["install_dir"] = install_dir
+        self.install_dir = Value(install_dir)
+        self.latest_release = None
+        self.manifest = None
+        self.hash_cache = bootstrap.HashCache()
+        self.release_cache = bootstrap.load_release_cache()
+        self.store = bootstrap.AssetStore(limit=self.cfg["cache_limit_mb"] * 1024 * 1024)
+        self.zip_path = bootstrap.ZIP_PATH
+        self.zip_source = None
+        self.swapped_in = False
+        self.closed = False
+        self.file_log = None
+        self.lines = []
+        self.action = None
+
+    def log(self, msg):
+        self.lines.append(msg)
+
+    def call_soon(self, fn):
+        fn()
+
+    def set_action(self, text, command):
+        self.action = text
+
+    def report_progress(self, done, total, rate):
+        pass
+
+
+class Value:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+def game_files(version, changed=2, count=20):
+    """
+    count files of which the first `changed` differ between versions.
+    """
+    files = {}
+    for i in range(count):
+        tag = version if i < changed else 1
+        files[f"data/f{i}.txt"] = (f"file {i} v{tag}\n" * 4000).encode("utf-8")
+    files[bootstrap.GAME_EXE] = b"EXE" * 1000
+    return files
+
+
+def installed_matches(launcher, files):
+    root = launcher.install_dir.get()
+    for name, data in files.items():
+        fp = os.path.join(root, name)
+        if not os.path.exists(fp):
+            return False
+        with open(fp, "rb") as f:
+            if f.read() != data:
+                return False
+    return True
+
+
+def new_launcher():
+    launcher = HeadlessLauncher(os.path.join(WORK, "game"))
+    launcher.check_state()
+    return launcher
+
+
+# -------------------------
+# Checks
+# -------------------------
+
+def check_delta_update():
+    """
+    v1 installs from the full zip; v2 changes two files, which the
+    delta update fetches as ranges of the v2 full zip.
+    """
+    SERVER.publish(1, game_files(1))
+    launcher = new_launcher()
+    launcher.install_full()
+
+    ok = installed_matches(launcher, game_files(1)) and launcher.cfg["installed_version"] == "1"
+
+    SERVER.publish(2, game_files(2))
+    launcher = new_launcher()
+    SERVER.requests.clear()
+    launcher.update_game()
+
+    zip_path = "/download/v2/LifeRPG_full.zip"
+    full_downloads = [p for p, r in SERVER.requests if p == zip_path and not r]
+
+    return (
+        ok
+        and installed_matches(launcher, game_files(2))
+        and launcher.cfg["installed_version"] == "2"
+        and bool(SERVER.range_requests(zip_path))
+        and not full_downloads
+    )
+
+
+def check_noop_update_rollback():
+    """
+    v3 ships the same files as v2: the update swaps nothing, so Roll
+    Back still returns to v1, and records it as v1.
+    """
+    SERVER.publish(3, game_files(2))
+    launcher = new_launcher()
+    launcher.update_game()
+
+    ok = launcher.cfg["installed_version"] == "3"
+
+    launcher.rollback()
+    return (
+        ok
+        and launcher.cfg["installed_version"] == "1"
+        and installed_matches(launcher, game_files(1))
+    )
+
+
+def check_stale_partial():
+    """
+    A partial of another archive left in download.zip.part must not be
+    resumed into the full zip being installed.
+    """
+    SERVER.publish(4, game_files(4))
+    other = SERVER.files["/download/v2/LifeRPG_full.zip"]
+
+    part = bootstrap.ZIP_PATH + ".part"
+    with open(part, "wb") as f:
+        f.write(other[:len(other) // 2])
+    with open(part + ".meta", "w", encoding="utf-8") as f:
+        json.dump({"url": SERVER.base + "/download/v2/LifeRPG_full.zip", "validator": '"x"'}, f)
+
+    launcher = new_launcher()
+    shutil.rmtree(launcher.install_dir.get(), ignore_errors=True)
+    launcher.install_full()
+
+    return installed_matches(launcher, game_files(4)) and launcher.cfg["installed_version"] == "4"
+
+
+def check_resume():
+    """
+    A download cut short is resumed with Range and If-Range rather than
+    started over.
+    """
+    SERVER.publish(5, game_files(5, changed=20))
+    zip_path = "/download/v5/LifeRPG_full.zip"
+    SERVER.cut_next = (zip_path, len(SERVER.files[zip_path]) // 3)
+
+    launcher = new_launcher()
+    shutil.rmtree(launcher.install_dir.get(), ignore_errors=True)
+    SERVER.requests.clear()
+    launcher.install_full()
+
+    return (
+        installed_matches(launcher, game_files(5, changed=20))
+        and len(SERVER.range_requests(zip_path)) == 1
+    )
+
+
+CHECKS = {
+    "delta update over ranges": check_delta_update,
+    "no-op update keeps rollback version": check_noop_update_rollback,
+    "stale partial download": check_stale_partial,
+    "interrupted download resumes": check_resume,
+}
+
+
+def main():
+    failed = []
+
+    for name, check in CHECKS.items():
+        ok = check()
+        print(f"{name}: {'ok' if ok else 'FAILED'}")
+        if not ok:
+            failed.append(name)
+
+    shutil.rmtree(WORK, ignore_errors=True)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+"""
+TickTick integration checks against a local stand-in for the Open API
+(task payloads in the documented format, /task/query paged with
+nextCursor and filtered by modifiedSince, completions deduplicated by
+Idempotency-Key).
+
+    python benchmarks/check_ticktick_sync.py
+"""
+import os
+import re
+import sys
+import json
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORK = tempfile.mkdtemp(prefix="liferpg-ticktick-")
+
+# must be set before the engine is imported
+os.environ["LIFERPG_SAVE_DIR"] = os.path.join(WORK, "save")
+
+import requests  # noqa: E402
+
+import api_ticktick  # noqa: E402
+from api_ticktick import (  # noqa: E402
+    CompletionQueue, SyncEngine, TaskImporter, TickTickClient, TickTickPoller
+)
+from liferpg.engine.player import Player  # noqa: E402
+
+NOW = datetime(2019, 11, 14, tzinfo=timezone.utc)
+TOKEN = "stand-in-token"
+
+
+# -------------------------
+# Stand-in server
+# -------------------------
+
+class TickTickServer:
+    """
+    In-memory task list behind the Open API routes the app uses. Every
+    change bumps the task's modifiedTime. Pages hold at most `page_limit`
+    tasks; `outage` = (first, count) makes those /task/query calls
+    (numbered from 1 since `queries` was last cleared) answer 503, and
+    `completions_down` makes every completion answer 503.
+    """
+
+    def __init__(self, page_limit=10):
+        self.tasks = {}
+        self.queries = []
+        self.page_limit = page_limit
+        self.outage = (0, 0)
+        self.completions = []   # (task id, idempotency key) per request
+        self.completions_down = False
+        self.clock = datetime(2019, 11, 13, tzinfo=timezone.utc)
+        self.lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                server.handle(self)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base = f"http://127.0.0.1:{self.httpd.server_address[1]}/open/v1"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def tick(self):
+        self.clock += timedelta(seconds=1)
+        return self.clock.strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+
+    def put(self, tid, **fields):
+        with self.lock:
+            task = self.tasks.setdefault(tid, {"id": tid, "title": tid, "status": 0})
+            task.update(fields)
+            task["modifiedTime"] = self.tick()
+
+    def handle(self, req):
+        if req.headers.get("Authorization") != f"Bearer {TOKEN}":
+            self.send(req, 401, {"error": "unauthorized"})
+            return
+
+        length = int(req.headers.get("Content-Length") or 0)
+        body = json.loads(req.rfile.read(length) or b"{}")
+
+        complete = re.search(r"/task/([^/]+)/complete$", req.path)
+
+        if req.path.endswith("/task/query"):
+            self.query(req, body)
+        elif complete:
+            self.complete(req, complete.group(1))
+        else:
+            self.send(req, 404, {"error": "not found"})
+
+    def query(self, req, body):
+        with self.lock:
+            self.queries.append(body)
+
+            first, count = self.outage
+            if first <= len(self.queries) < first + count:
+                self.send(req, 503, {"error": "unavailable"}, {"Retry-After": "0"})
+                return
+
+            since = body.get("modifiedSince")
+            matching = sorted(
+                (t for t in self.tasks.values() if since is None or t["modifiedTime"] > since),
+                key=lambda t: t["modifiedTime"]
+            )
+
+            start = int(body.get("cursor") or 0)
+            end = start + min(body.get("limit", self.page_limit), self.page_limit)
+            page = {"tasks": [dict(t) for t in matching[start:end]]}
+            if end < len(matching):
+                page["nextCursor"] = str(end)
+
+        self.send(req, 200, page)
+
+    def complete(self, req, tid):
+        key = req.headers.get("Idempotency-Key")
+
+        with self.lock:
+            if self.completions_down:
+                self.send(req, 503, {"error": "unavailable"})
+                return
+
+            task = self.tasks.get(tid)
+            if task is None:
+                self.send(req, 404, {"error": "task not found"})
+                return
+
+            replay = any(k == key for _, k in self.completions)
+            self.completions.append((tid, key))
+
+            if not replay:
+                task["status"] = api_ticktick.STATUS_COMPLETED
+                task["modifiedTime"] = self.tick()
+
+        self.send(req, 200, {})
+
+    def send(self, req, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        req.send_response(status)
+        for name, value in (headers or {}).items():
+            req.send_header(name, value)
+        req.send_header("Content-Type", "application/json")
+        req.send_header("Content-Length", str(len(body)))
+        req.end_headers()
+        req.wfile.write(body)
+
+
+SERVER = TickTickServer()
+
+
+def new_client(retries=0):
+    return TickTickClient(
+        TOKEN, base=SERVER.base, session=requests.Session(), retries=retries, backoff=0.01
+    )
+
+
+class InlineEngine:
+    """
+    EngineWorker stand-in that runs commands on the calling thread.
+    """
+
+    def __init__(self, player):
+        self.player = player
+
+    def submit(self, command, *args):
+        command(self.player, *args)
+
+
+def new_player(profile):
+    return Player(profile_id=profile)
+
+
+def ledger(profile):
+    return os.path.join(WORK, f"{profile}-ledger.json")
+
+
+# -------------------------
+# Checks
+# -------------------------
+
+def check_due_date():
+    """
+    An open task past its dueDate (documented as 2019-11-13T03:00:00+0000,
+    no milliseconds) is failed; one not yet due stays open.
+    """
+    player = new_player("due")
+    importer = TaskImporter(player, ledger_file=ledger("due"))
+    integrity = player.data["ship_integrity"]
+
+    items = [
+        {"id": "late", "title": "late", "status": 0, "dueDate": "2019-11-13T03:00:00+0000"},
+        {"id": "soon", "title": "soon", "status": 0, "dueDate": "2019-11-15T03:00:00+0000"},
+    ]
+    completed, failed, pending = importer.import_tasks(items, now=NOW)
+
+    return (
+        api_ticktick.parse_time(items[0]["dueDate"]) is not None
+        and [t.id for t in failed] == ["late"]
+        and [t.id for t in pending] == ["soon"]
+        and player.data["ship_integrity"] < integrity
+    )
+
+
+def reset_server(ids):
+    SERVER.tasks.clear()
+    SERVER.outage = (0, 0)
+    for tid in ids:
+        SERVER.put(tid)
+
+
+def check_sync_pages():
+    """
+    A full sync pages through nextCursor; after commit() and a restart,
+    the next sync sends the committed modifiedSince and gets only what
+    changed after it.
+    """
+    reset_server(f"s{i}" for i in range(25))
+    state_file = os.path.join(WORK, "sync-pages.json")
+    engine = SyncEngine(new_client(), state_file=state_file)
+
+    SERVER.queries.clear()
+    first = [task["id"] for task in engine.sync()]
+    engine.commit()
+
+    newest = max(task["modifiedTime"] for task in SERVER.tasks.values())
+    ok = (
+        sorted(first) == sorted(SERVER.tasks)
+        and [q.get("cursor") for q in SERVER.queries] == [None, "10", "20"]
+        and engine.state["modified_since"] == newest
+    )
+
+    SERVER.put("s3", status=api_ticktick.STATUS_COMPLETED)
+    SERVER.put("new")
+
+    engine = SyncEngine(new_client(), state_file=state_file)
+    SERVER.queries.clear()
+    second = [task["id"] for task in engine.sync()]
+
+    return (
+        ok
+        and second == ["s3", "new"]
+        and SERVER.queries[0].get("modifiedSince") == newest
+    )
+
+
+def check_sync_not_committed():
+    """
+    A sync that fails part way, or that is consumed but never committed,
+    leaves the stored cursor alone, so the next sync asks again.
+    """
+    reset_server(f"u{i}" for i in range(15))
+    state_file = os.path.join(WORK, "sync-retry.json")
+    engine = SyncEngine(new_client(), state_file=state_file)
+
+    list(engine.sync())
+    engine.commit()
+    committed = engine.state["modified_since"]
+
+    for i in range(15):
+        SERVER.put(f"u{i}", title="changed")
+
+    # the second page fails after the first was handed out
+    SERVER.queries.clear()
+    SERVER.outage = (2, 1)
+    seen = []
+    try:
+        for task in engine.sync():
+            seen.append(task["id"])
+    except api_ticktick.TickTickError:
+        pass
+
+    ok = len(seen) == 10 and engine.state["modified_since"] == committed
+
+    # consumed, but the engine never applied it
+    SERVER.outage = (0, 0)
+    list(engine.sync())
+
+    engine = SyncEngine(new_client(), state_file=state_file)
+    SERVER.queries.clear()
+    again = [task["id"] for task in engine.sync()]
+
+    return (
+        ok
+        and len(again) == 15
+        and SERVER.queries[0].get("modifiedSince") == committed
+    )
+
+
+def check_retry():
+    """
+    5xx answers (with Retry-After) are retried rather than failing the
+    sync.
+    """
+    reset_server(["r1"])
+    engine = SyncEngine(new_client(retries=3), state_file=os.path.join(WORK, "sync-503.json"))
+
+    SERVER.queries.clear()
+    SERVER.outage = (1, 2)
+    ids = [task["id"] for task in engine.sync()]
+
+    return ids == ["r1"] and len(SERVER.queries) == 3
+
+
+def check_outbox_offline():
+    """
+    Completions recorded while TickTick is unreachable stay queued across
+    a restart and are pushed, and acknowledged, once it answers again.
+    """
+    reset_server(["o1", "o2"])
+    path = os.path.join(WORK, "outbox-offline.jsonl")
+
+    SERVER.completions_down = True
+    outbox = CompletionQueue(new_client(), path=path)
+    outbox.record(to_task("o1"))
+    outbox.record(to_task("o2"))
+    ok = outbox.flush() == 0 and len(outbox.pending()) == 2
+
+    SERVER.completions_down = False
+    outbox = CompletionQueue(new_client(), path=path)
+    ok = ok and outbox.flush() == 2
+
+    return (
+        ok
+        and all(SERVER.tasks[tid]["status"] == api_ticktick.STATUS_COMPLETED for tid in ("o1", "o2"))
+        and not CompletionQueue(new_client(), path=path).pending()
+    )
+
+
+def check_outbox_replay():
+    """
+    A push that reached TickTick but was not acknowledged before a crash
+    is replayed with the same idempotency key; a push for a task that no
+    longer exists is dropped instead of retried forever.
+    """
+    reset_server(["p1"])
+    SERVER.completions.clear()
+    path = os.path.join(WORK, "outbox-replay.jsonl")
+
+    outbox = CompletionQueue(new_client(), path=path)
+    key = outbox.record(to_task("p1"))
+    outbox.record(to_task("gone"))
+
+    # delivered, then the process dies before the ack is written
+    new_client().complete_task("p1", idempotency_key=key)
+
+    outbox = CompletionQueue(new_client(), path=path)
+    pushed = outbox.flush()
+
+    return (
+        pushed == 2
+        and [k for tid, k in SERVER.completions if tid == "p1"] == [key, key]
+        and not outbox.pending()
+    )
+
+
+def check_poller_completion():
+    """
+    A task completed in the app is rewarded once: the next poll pushes it
+    and then sees it come back completed, which must not pay again.
+    """
+    reset_server(["app1"])
+    player = new_player("poller")
+    poller = TickTickPoller(
+        new_client(), InlineEngine(player),
+        outbox=CompletionQueue(new_client(), path=os.path.join(WORK, "outbox-poller.jsonl"))
+    )
+
+    poller.poll_now(full=True)
+    _, pending = poller.updates.get_nowait()
+    task = pending[0]
+
+    before = player.data["total_navigation_data"]
+    poller.complete(player, task)
+    poller.poll_now()
+
+    updates = []
+    while not poller.updates.empty():
+        updates.append(poller.updates.get_nowait())
+
+    return (
+        [t.id for t in pending] == ["app1"]
+        and player.data["total_navigation_data"] - before == task.xp_reward()
+        and SERVER.tasks["app1"]["status"] == api_ticktick.STATUS_COMPLETED
+        and not poller.outbox.pending()
+        and updates[-1] == ("tasks", [])
+    )
+
+
+def to_task(tid):
+    return api_ticktick.to_task({"id": tid, "title": tid})
+
+
+CHECKS = {
+    "dueDate overdue detection": check_due_date,
+    "sync pages and modifiedSince": check_sync_pages,
+    "uncommitted sync is repeated": check_sync_not_committed,
+    "503 is retried": check_retry,
+    "outbox queued while offline": check_outbox_offline,
+    "outbox replay and dropped task": check_outbox_replay,
+    "app completion rewarded once": check_poller_completion,
+}
+
+
+def main():
+    failed = []
+
+    for name, check in CHECKS.items():
+        ok = check()
+        print(f"{name}: {'ok' if ok else 'FAILED'}")
+        if not ok:
+            failed.append(name)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
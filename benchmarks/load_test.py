@@ -0,0 +1,119 @@
+"""
+Load test for the JSON API: concurrent keep-alive clients completing
+tasks across many profiles, reporting p50/p99 latency and requests/s.
+
+    python benchmarks/load_test.py                      # in-process server, temp saves
+    python benchmarks/load_test.py --port 8080          # against a running server
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def client(host, port, profiles, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+
+    try:
+        while time.perf_counter() < deadline:
+            pid = f"load{random.randrange(profiles)}"
+
+            if random.random() < 0.8:
+                method, action = "POST", "complete_task"
+                body = json.dumps({
+                    "id": random.randrange(10 ** 6),
+                    "name": "load",
+                    "difficulty": random.choice(("easy", "medium", "hard"))
+                }).encode()
+            else:
+                method, action, body = "GET", "player", b""
+
+            request = (
+                f"{method} /profiles/{pid}/{action} HTTP/1.1\r\n"
+                f"Host: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n"
+            ).encode() + body
+
+            started = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+
+            status = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode().partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+
+            latencies.append(time.perf_counter() - started)
+            if b" 200 " not in status:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+async def run(args):
+    api = None
+
+    if args.port is None:
+        from liferpg.service.http_api import ApiServer
+        api = ApiServer(capacity=args.cache, workers=args.workers)
+        server = await api.start(args.host, 0)
+        args.port = server.sockets[0].getsockname()[1]
+
+    latencies, errors = [], []
+    started = time.perf_counter()
+    deadline = started + args.duration
+
+    await asyncio.gather(*[
+        client(args.host, args.port, args.profiles, deadline, latencies, errors)
+        for _ in range(args.connections)
+    ])
+    elapsed = time.perf_counter() - started
+
+    if api is not None:
+        await api.close()
+
+    latencies.sort()
+    print(f"{len(latencies)} requests, {args.connections} connections, "
+          f"{args.profiles} profiles, {len(errors)} errors")
+    print(f"  {len(latencies) / elapsed:10.1f} req/s")
+    print(f"  p50 {percentile(latencies, 0.50) * 1000:8.2f} ms")
+    print(f"  p99 {percentile(latencies, 0.99) * 1000:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LifeRPG API load test")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="existing server; default starts one")
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--profiles", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--cache", type=int, default=64, help="players kept loaded (in-process server)")
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    if args.port is None and "LIFERPG_SAVE_DIR" not in os.environ:
+        # must be set before the engine is imported
+        os.environ["LIFERPG_SAVE_DIR"] = tempfile.mkdtemp(prefix="liferpg-load-")
+        print(f"saves in {os.environ['LIFERPG_SAVE_DIR']}")
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Thread-safety stress test: many threads hammer complete_task, fail_task
+and dev_add_xp on one Player (with timed background saves), then the
+final state is checked against what the threads did.
+
+    python benchmarks/stress_player.py [threads] [calls_per_thread]
+"""
+import os
+import sys
+import random
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# must be set before the engine is imported
+os.environ.setdefault("LIFERPG_SAVE_DIR", tempfile.mkdtemp(prefix="liferpg-stress-"))
+
+from liferpg.engine.player import Player
+from liferpg.engine.progression import resolve_rank
+from liferpg.engine.task import Task
+
+# switch threads as often as possible to shake out interleavings
+sys.setswitchinterval(1e-6)
+
+DEV_XP = 7
+
+
+def hammer(player, seed, calls, with_fail, totals):
+    rng = random.Random(seed)
+    task = Task("stress", "stress", "hard")
+    failure = Task("stress-fail", "stress", "easy")
+
+    xp = credits = 0
+
+    for _ in range(calls):
+        roll = rng.random()
+
+        if roll < 0.6:
+            player.complete_task(task)
+            xp += task.xp_reward()
+            credits += task.xp_reward() // 5
+        elif roll < 0.8 or not with_fail:
+            player.dev_add_xp(DEV_XP)
+            xp += DEV_XP
+            credits += DEV_XP // 5
+        else:
+            player.fail_task(failure)
+
+    totals[seed] = (xp, credits)
+
+
+def run(threads, calls, with_fail):
+    profile = "stress-fail" if with_fail else "stress"
+    player = Player(save_window=0.001, profile_id=profile)
+
+    start_xp = player.data["total_navigation_data"]
+    start_credits = player.data["credits"]
+    quest_rewards = {
+        qid: dict(q.rewards) for qid, q in player.quest_manager.quests.items()
+        if not q.rewards.get("_applied")
+    }
+
+    totals = {}
+    workers = [
+        threading.Thread(target=hammer, args=(player, seed, calls, with_fail, totals))
+        for seed in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    player.flush()
+    data = player.data
+
+    # every pending quest completes within the first few calls
+    reward_xp = sum(r.get("navigation_data", 0) for r in quest_rewards.values())
+    reward_credits = sum(
+        r.get("credits", 0) + r.get("navigation_data", 0) // 5
+        for r in quest_rewards.values()
+    )
+
+    checks = {
+        "navigation data": data["total_navigation_data"]
+        == start_xp + sum(xp for xp, _ in totals.values()) + reward_xp,
+        "rank": (data["rank"], data["current_navigation_data"], data["next_rank_requirement"])
+        == resolve_rank(data["total_navigation_data"]),
+        "integrity": 0 < data["ship_integrity"] <= data["max_integrity"],
+        "saved state": Player(profile_id=profile).data == data,
+    }
+
+    # critical failures take a share of credits, so only exact without them
+    if not with_fail:
+        checks["credits"] = (
+            data["credits"] == start_credits + sum(c for _, c in totals.values()) + reward_credits
+        )
+
+    label = "with fail_task" if with_fail else "without fail_task"
+    failed = [name for name, ok in checks.items() if not ok]
+    print(f"{label:>18}: {threads} threads x {calls} calls, "
+          + ("all invariants hold" if not failed else f"FAILED: {', '.join(failed)}"))
+    return not failed
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    calls = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    print(f"saves in {os.environ['LIFERPG_SAVE_DIR']}")
+    ok = run(threads, calls, with_fail=False)
+    ok = run(threads, calls, with_fail=True) and ok
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
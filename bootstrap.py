@@ -1,10 +1,19 @@
 import os
 import json
+import queue
+import logging
+import logging.handlers
+import shutil
 import hashlib
+import struct
+import zlib
+import urllib.error
 import urllib.request
 import subprocess
 import threading
+import time
 import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import tkinter as tk
 from tkinter import ttk, filedialog
 from datetime import datetime
@@ -17,18 +26,39 @@ LAUNCHER_VERSION = "1.7.0"
 
 GITHUB_OWNER = "Hunterkilla1018"
 GITHUB_REPO = "Life_RPG"
+# overridable so a local stand-in server can serve releases
+GITHUB_API = os.environ.get("LIFERPG_RELEASE_API", "https://api.github.com")
 
 GAME_EXE = "LifeRPG.exe"
 FULL_INSTALL_ZIP = "LifeRPG_full.zip"
 PATCH_ZIP = "LifeRPG_patch.zip"
 MANIFEST_NAME = "manifest.json"
 
+# written by the game inside its install dir; never part of a release, so
+# moved across installs instead of being staged, swapped or rolled back
+USER_DATA = ("life_rpg_save",)
+
 APPDATA = os.path.join(os.environ.get("APPDATA", os.getcwd()), "LifeRPG")
 RUNTIME = os.path.join(APPDATA, "runtime")
 CONFIG_FILE = os.path.join(APPDATA, "launcher.json")
+LOG_FILE = os.path.join(APPDATA, "launcher.log")
 
 ZIP_PATH = os.path.join(RUNTIME, "download.zip")
+STORE_DIR = os.path.join(RUNTIME, "store")
+# LRU timestamps are persisted at most this often per object
+STORE_TOUCH_SECONDS = 60
 RUNTIME_MANIFEST = os.path.join(RUNTIME, MANIFEST_NAME)
+HASH_CACHE_FILE = os.path.join(RUNTIME, "hash_cache.json")
+RELEASE_CACHE_FILE = os.path.join(RUNTIME, "release_cache.json")
+
+HASH_BUFFER = 1024 * 1024
+DOWNLOAD_CHUNK = 256 * 1024
+DOWNLOAD_RETRIES = 5
+
+LOG_MAX_LINES = 2000
+LOG_BATCH = 500
+LOG_INTERVAL_MS = 100
+VERIFY_WORKERS = min(8, (os.cpu_count() or 1) * 2)
 
 os.makedirs(RUNTIME, exist_ok=True)
 
@@ -39,26 +69,597 @@ os.makedirs(RUNTIME, exist_ok=True)
 def sha256(path):
     h = hashlib.sha256()
     with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
+        for chunk in iter(lambda: f.read(HASH_BUFFER), b""):
             h.update(chunk)
     return h.hexdigest()
 
+
+class HashCache:
+    """
+    Persistent file hashes keyed by path, trusted only while the file's
+    size, mtime and inode are unchanged. A hard link elsewhere shares
+    that stamp, so it is recognized without rehashing.
+    """
+
+    def __init__(self, path=HASH_CACHE_FILE):
+        self.path = path
+        self.entries = {}
+        self.by_stamp = {}
+        self.lock = threading.Lock()
+
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except:
+                self.entries = {}
+
+        for entry in self.entries.values():
+            self.by_stamp[tuple(entry["stamp"])] = entry["sha256"]
+
+    @staticmethod
+    def key(fp):
+        return os.path.normcase(os.path.abspath(fp))
+
+    def hash(self, fp, full=False):
+        st = os.stat(fp)
+        key = self.key(fp)
+        stamp = [st.st_size, st.st_mtime_ns, st.st_ino]
+
+        with self.lock:
+            entry = self.entries.get(key)
+            linked = self.by_stamp.get(tuple(stamp))
+
+        if not full:
+            if entry and entry["stamp"] == stamp:
+                return entry["sha256"]
+            if linked:
+                with self.lock:
+                    self.entries[key] = {"stamp": stamp, "sha256": linked}
+                return linked
+
+        digest = sha256(fp)
+
+        with self.lock:
+            self.entries[key] = {"stamp": stamp, "sha256": digest}
+            self.by_stamp[tuple(stamp)] = digest
+
+        return digest
+
+    def rebase(self, old_root, new_root):
+        """
+        Moves entries under old_root to new_root after a directory rename.
+        """
+        old_root = self.key(old_root) + os.sep
+        new_root = self.key(new_root) + os.sep
+
+        with self.lock:
+            for key in [k for k in self.entries if k.startswith(old_root)]:
+                self.entries[new_root + key[len(old_root):]] = self.entries.pop(key)
+
+    def save(self):
+        with self.lock:
+            data = json.dumps(self.entries)
+
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+
 def normalize_version(v):
     return v.lstrip("v").strip() if v else ""
 
-def download(url, dest):
-    urllib.request.urlretrieve(url, dest)
+def download(url, dest, progress=None, expected_sha256=None):
+    """
+    Streams url to dest, hashing while writing. Data lands in dest.part
+    first; after an interruption the next attempt resumes it with an
+    HTTP Range request, but only if the partial came from the same url
+    and the server confirms it is unchanged (If-Range on its validator).
+    progress(done, total, bytes_per_sec) is called per chunk. Returns
+    the SHA-256 of the finished file.
+    """
+    part = dest + ".part"
+
+    for attempt in range(DOWNLOAD_RETRIES):
+        try:
+            digest = _download_once(url, part, progress)
+            break
+        except (urllib.error.URLError, ConnectionError, TimeoutError) as e:
+            if isinstance(e, urllib.error.HTTPError) and e.code < 500:
+                raise
+            if attempt == DOWNLOAD_RETRIES - 1:
+                raise
+            time.sleep(2 ** attempt)
+
+    if expected_sha256 and digest != expected_sha256:
+        _discard_part(part)
+        raise ValueError(f"SHA-256 mismatch for {os.path.basename(dest)}")
+
+    os.replace(part, dest)
+    _discard_part(part)
+    return digest
+
+
+def _read_part_meta(part):
+    try:
+        with open(part + ".meta", "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_part_meta(part, meta):
+    with open(part + ".meta", "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+def _discard_part(part):
+    for path in (part, part + ".meta"):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _validator(r):
+    """
+    A validator usable with If-Range: a strong ETag, else Last-Modified.
+    """
+    etag = r.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return r.headers.get("Last-Modified")
+
+
+def _download_once(url, part, progress):
+    h = hashlib.sha256()
+    have = os.path.getsize(part) if os.path.exists(part) else 0
+
+    # dest.part is shared by every url saved to dest; only a partial
+    # of this url with a known validator can be resumed
+    meta = _read_part_meta(part)
+    if have and (meta.get("url") != url or not meta.get("validator")):
+        _discard_part(part)
+        have = 0
+
+    req = urllib.request.Request(url)
+    if have:
+        req.add_header("Range", f"bytes={have}-")
+        req.add_header("If-Range", meta["validator"])
+
+    try:
+        r = urllib.request.urlopen(req, timeout=30)
+    except urllib.error.HTTPError as e:
+        if e.code != 416:
+            raise
+        # stale partial bigger than the file; start over
+        _discard_part(part)
+        return _download_once(url, part, progress)
+
+    with r:
+        content_range = r.headers.get("Content-Range", "")
+        if have and r.status == 206 and content_range.startswith(f"bytes {have}-"):
+            # resuming: fold what is already on disk into the hash
+            with open(part, "rb") as f:
+                for chunk in iter(lambda: f.read(HASH_BUFFER), b""):
+                    h.update(chunk)
+            mode = "ab"
+        else:
+            # full body: the file changed or the server ignored the range
+            have = 0
+            mode = "wb"
+            _write_part_meta(part, {"url": url, "validator": _validator(r)})
+
+        length = r.headers.get("Content-Length")
+        total = have + int(length) if length else None
+
+        done = have
+        started = time.monotonic()
+
+        with open(part, mode) as f:
+            for chunk in iter(lambda: r.read(DOWNLOAD_CHUNK), b""):
+                f.write(chunk)
+                h.update(chunk)
+                done += len(chunk)
+
+                if progress:
+                    elapsed = max(time.monotonic() - started, 1e-6)
+                    progress(done, total, (done - have) / elapsed)
+
+        if total is not None and done < total:
+            raise ConnectionError(f"connection closed at {done} of {total} bytes")
+
+    return h.hexdigest()
+
+def load_release_cache():
+    if os.path.exists(RELEASE_CACHE_FILE):
+        try:
+            with open(RELEASE_CACHE_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except:
+            pass
+    return {}
+
+def save_release_cache(cache):
+    tmp = RELEASE_CACHE_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    os.replace(tmp, RELEASE_CACHE_FILE)
+
+def fetch_latest_release(cache=None):
+    """
+    With a cache dict, revalidates the cached release using its ETag and
+    returns (release, changed); a 304 answers from the cache.
+    """
+    url = f"{GITHUB_API}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/releases/latest"
+
+    if cache is None:
+        with urllib.request.urlopen(url, timeout=10) as r:
+            return json.loads(r.read().decode())
+
+    req = urllib.request.Request(url)
+    if cache.get("etag") and cache.get("release"):
+        req.add_header("If-None-Match", cache["etag"])
+
+    try:
+        with urllib.request.urlopen(req, timeout=10) as r:
+            release = json.loads(r.read().decode())
+            etag = r.headers.get("ETag")
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return cache["release"], False
+        raise
+
+    changed = release != cache.get("release")
+    cache["release"] = release
+    cache["etag"] = etag
+    save_release_cache(cache)
+
+    return release, changed
+
+def asset_key(asset):
+    # a release asset never changes under the same id and timestamp
+    return f"{asset.get('id')}:{asset.get('updated_at')}:{asset['browser_download_url']}"
+
+def asset_digest(asset):
+    digest = asset.get("digest") or ""
+    return digest[len("sha256:"):] if digest.startswith("sha256:") else None
+
+def normalize_member(name):
+    return name.replace("\\", "/").lstrip("/")
+
+
+def install_target(install_path, name):
+    """
+    Resolves a zip member name inside install_path, refusing paths that
+    would escape it.
+    """
+    root = os.path.abspath(install_path)
+    target = os.path.abspath(os.path.join(root, *normalize_member(name).split("/")))
+
+    if os.path.commonpath([root, target]) != root:
+        raise ValueError(f"unsafe path in zip: {name}")
+    return target
+
+
+def link_tree(src, dst, skip=()):
+    """
+    Mirrors src into dst with hard links, copying where linking fails
+    (e.g. across volumes). Top-level entries named in `skip` are left out.
+    """
+    for dirpath, dirnames, filenames in os.walk(src):
+        rel = os.path.relpath(dirpath, src)
+        if rel == ".":
+            dirnames[:] = [d for d in dirnames if d not in skip]
+            filenames = [f for f in filenames if f not in skip]
+        target_dir = os.path.normpath(os.path.join(dst, rel))
+        os.makedirs(target_dir, exist_ok=True)
+
+        for name in filenames:
+            source = os.path.join(dirpath, name)
+            target = os.path.join(target_dir, name)
+            try:
+                os.link(source, target)
+            except OSError:
+                shutil.copy2(source, target)
+
+
+def move_user_data(src_root, dst_root):
+    """
+    Moves USER_DATA entries from one install tree to another, replacing
+    any stale copy there. Returns the names moved.
+    """
+    moved = []
+    for name in USER_DATA:
+        source = os.path.join(src_root, name)
+        if not os.path.exists(source):
+            continue
+
+        target = os.path.join(dst_root, name)
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        elif os.path.exists(target):
+            os.remove(target)
+
+        os.rename(source, target)
+        moved.append(name)
+    return moved
+
+
+def file_crc32(path):
+    crc = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_BUFFER), b""):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+class RangeUnsupported(Exception):
+    pass
+
+
+class RemoteZip:
+    """
+    Reads single members of a remote zip with HTTP Range requests,
+    located through its central directory. Zip64 is not supported.
+    """
+
+    EOCD = b"PK\x05\x06"
+    CENTRAL = b"PK\x01\x02"
+    LOCAL = b"PK\x03\x04"
+
+    def __init__(self, url):
+        self.url = url
+        self.members = {}
+        self._read_central_directory()
+
+    def _get(self, range_header):
+        req = urllib.request.Request(self.url, headers={"Range": range_header})
+        with urllib.request.urlopen(req, timeout=30) as r:
+            if r.status != 206:
+                raise RangeUnsupported(f"server answered {r.status} to a range request")
+            return r.read()
+
+    def _range(self, start, end):
+        return self._get(f"bytes={start}-{end - 1}")
+
+    def _read_central_directory(self):
+        tail = self._get(f"bytes=-{65536 + 22}")
+
+        pos = tail.rfind(self.EOCD)
+        if pos < 0:
+            raise ValueError("zip end of central directory not found")
+
+        _, _, _, _, count, cd_size, cd_offset, _ = struct.unpack(
+            "<4s4H2LH", tail[pos:pos + 22]
+        )
+        if cd_offset == 0xFFFFFFFF:
+            raise ValueError("zip64 archives are not supported")
+
+        directory = self._range(cd_offset, cd_offset + cd_size)
+
+        pos = 0
+        for _ in range(count):
+            fields = struct.unpack("<4s6H3L5H2L", directory[pos:pos + 46])
+            if fields[0] != self.CENTRAL:
+                raise ValueError("corrupt zip central directory")
+
+            flags, method = fields[3], fields[4]
+            crc, csize, usize = fields[7], fields[8], fields[9]
+            name_len, extra_len, comment_len = fields[10], fields[11], fields[12]
+            offset = fields[16]
+
+            raw_name = directory[pos + 46:pos + 46 + name_len]
+            name = raw_name.decode("utf-8" if flags & 0x800 else "cp437")
+
+            self.members[normalize_member(name)] = {
+                "method": method,
+                "crc": crc,
+                "csize": csize,
+                "usize": usize,
+                "offset": offset,
+            }
+
+            pos += 46 + name_len + extra_len + comment_len
+
+    def read(self, name):
+        info = self.members[normalize_member(name)]
+        offset, csize = info["offset"], info["csize"]
+
+        # guess a small local header; refetch if its extra field is larger
+        chunk = self._range(offset, offset + 30 + 512 + csize)
+        if chunk[:4] != self.LOCAL:
+            raise ValueError(f"corrupt local header for {name}")
+
+        name_len, extra_len = struct.unpack("<2H", chunk[26:30])
+        start = 30 + name_len + extra_len
+
+        if len(chunk) < start + csize:
+            chunk = self._range(offset, offset + start + csize)
+
+        raw = chunk[start:start + csize]
+
+        if info["method"] == zipfile.ZIP_STORED:
+            data = raw
+        elif info["method"] == zipfile.ZIP_DEFLATED:
+            data = zlib.decompressobj(-15).decompress(raw)
+        else:
+            raise ValueError(f"unsupported compression for {name}")
+
+        if zlib.crc32(data) != info["crc"]:
+            raise ValueError(f"CRC mismatch for {name}")
+
+        return data
+
+
+class AssetStore:
+    """
+    Content-addressed store of downloaded archives and files under
+    RUNTIME, keyed by SHA-256. Objects past `limit` bytes are evicted
+    least recently used first. Archive members are indexed by their
+    manifest hash so single files can be recovered from a stored archive.
+    """
+
+    def __init__(self, root=STORE_DIR, limit=2048 * 1024 * 1024):
+        self.root = root
+        self.limit = limit
+        self.index_path = os.path.join(root, "index.json")
+        self.lock = threading.RLock()
+
+        self.objects = {}   # sha -> {"size": bytes, "used": timestamp}
+        self.members = {}   # file sha -> [archive sha, member name]
+        self.aliases = {}   # release asset key -> sha
+
+        os.makedirs(root, exist_ok=True)
+
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+                self.objects = index.get("objects", {})
+                self.members = index.get("members", {})
+                self.aliases = index.get("aliases", {})
+            except:
+                pass
+
+    def path(self, digest):
+        return os.path.join(self.root, digest[:2], digest)
+
+    def get(self, digest):
+        with self.lock:
+            if not digest or digest not in self.objects:
+                return None
+
+            fp = self.path(digest)
+            if not os.path.exists(fp):
+                self._forget(digest)
+                return None
+
+            entry = self.objects[digest]
+            now = time.time()
+            if now - entry["used"] >= STORE_TOUCH_SECONDS:
+                entry["used"] = now
+                self.save()
+            return fp
+
+    def put_file(self, src, digest=None):
+        """
+        Moves src into the store (dropping it if the content is already
+        there) and returns the stored path.
+        """
+        digest = digest or sha256(src)
+        fp = self.path(digest)
+
+        with self.lock:
+            if os.path.exists(fp):
+                os.remove(src)
+            else:
+                os.makedirs(os.path.dirname(fp), exist_ok=True)
+                os.replace(src, fp)
+
+            self.objects[digest] = {"size": os.path.getsize(fp), "used": time.time()}
+            self.evict(keep=digest)
+            self.save()
+
+        return fp
+
+    def put_bytes(self, data, digest=None):
+        digest = digest or hashlib.sha256(data).hexdigest()
+        if self.get(digest):
+            return self.path(digest)
+
+        tmp = os.path.join(self.root, f"{digest}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        return self.put_file(tmp, digest)
+
+    def index_archive(self, digest, manifest_files):
+        with zipfile.ZipFile(self.path(digest)) as z:
+            names = {normalize_member(info.filename) for info in z.infolist()}
+
+        with self.lock:
+            for rel, file_digest in manifest_files.items():
+                if normalize_member(rel) in names:
+                    self.members[file_digest] = [digest, normalize_member(rel)]
+            self.save()
+
+    def read_file(self, digest):
+        """
+        Returns a file's bytes from a stored copy or a stored archive
+        containing it, or None.
+        """
+        fp = self.get(digest)
+        if fp:
+            with open(fp, "rb") as f:
+                return f.read()
+
+        archive, name = self.members.get(digest, (None, None))
+        fp = self.get(archive)
+        if not fp:
+            return None
+
+        with zipfile.ZipFile(fp) as z:
+            for info in z.infolist():
+                if normalize_member(info.filename) == name:
+                    data = z.read(info)
+                    return data if hashlib.sha256(data).hexdigest() == digest else None
+        return None
+
+    def can_provide(self, digest):
+        return bool(self.get(digest) or self.get(self.members.get(digest, (None,))[0]))
+
+    def evict(self, keep=None):
+        with self.lock:
+            total = sum(o["size"] for o in self.objects.values())
+
+            for digest in sorted(self.objects, key=lambda d: self.objects[d]["used"]):
+                if total <= self.limit:
+                    break
+                if digest == keep:
+                    continue
+
+                total -= self.objects[digest]["size"]
+                self._remove(digest)
+
+    def discard(self, digest):
+        """
+        Drops an object found to be unusable, and every alias to it.
+        """
+        with self.lock:
+            self._remove(digest)
+            self.save()
+
+    def _remove(self, digest):
+        try:
+            os.remove(self.path(digest))
+        except OSError:
+            pass
+        self._forget(digest)
+
+    def _forget(self, digest):
+        self.objects.pop(digest, None)
+        self.members = {k: v for k, v in self.members.items() if v[0] != digest}
+        self.aliases = {k: v for k, v in self.aliases.items() if v != digest}
+
+    def save(self):
+        with self.lock:
+            data = json.dumps({
+                "objects": self.objects,
+                "members": self.members,
+                "aliases": self.aliases,
+            })
+
+            tmp = self.index_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp, self.index_path)
 
-def fetch_latest_release():
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/releases/latest"
-    with urllib.request.urlopen(url, timeout=10) as r:
-        return json.loads(r.read().decode())
 
 def load_config():
     cfg = {
         "install_dir": "",
         "installed_version": "",
-        "dev_mode": False
+        "dev_mode": False,
+        "cache_limit_mb": 2048,
+        "file_log": False
     }
 
     if os.path.exists(CONFIG_FILE):
@@ -90,8 +691,25 @@ class Launcher(tk.Tk):
         self.install_dir = tk.StringVar(value=self.cfg["install_dir"])
         self.latest_release = None
         self.manifest = None
+        self.hash_cache = HashCache()
+        self.release_cache = load_release_cache()
+        self.store = AssetStore(limit=self.cfg["cache_limit_mb"] * 1024 * 1024)
+        self.zip_path = ZIP_PATH
+        # (asset key, sha) of the archive in zip_path, kept once applied
+        self.zip_source = None
+        # set when staged_update swaps a new tree in, cleared by finalize_update
+        self.swapped_in = False
+
+        # worker threads never touch widgets; they queue lines and calls
+        # that the Tk thread drains in batches
+        self.log_queue = queue.Queue()
+        self.ui_calls = queue.Queue()
+        self.closed = False
+        self.file_log = None
+        self.set_file_log(self.cfg["file_log"])
 
         self._ui()
+        self.after(LOG_INTERVAL_MS, self.drain_ui)
         self.after(100, self.startup)
 
     # =========================
@@ -124,13 +742,115 @@ class Launcher(tk.Tk):
         ttk.Entry(footer, textvariable=self.install_dir, width=60).pack(side="left")
         ttk.Button(footer, text="Browse", command=self.browse).pack(side="left")
 
+        self.progress = ttk.Progressbar(self, length=600, maximum=1.0)
+        self.progress.pack(pady=(10, 0))
+
+        self.progress_label = ttk.Label(self, text="")
+        self.progress_label.pack()
+
         self.action_btn = ttk.Button(self, text="Checking...")
         self.action_btn.pack(pady=10)
 
+        self._progress_shown = 0
+
+    def report_progress(self, done, total, rate):
+        now = time.monotonic()
+        if total and done < total and now - self._progress_shown < 0.2:
+            return
+        self._progress_shown = now
+
+        mb = 1024 * 1024
+        if total:
+            text = f"{done / mb:.1f} / {total / mb:.1f} MB  ({rate / mb:.1f} MB/s)"
+        else:
+            text = f"{done / mb:.1f} MB  ({rate / mb:.1f} MB/s)"
+
+        def show():
+            self.progress["value"] = done / total if total else 0
+            self.progress_label.config(text=text)
+
+        self.call_soon(show)
+
+    # =========================
+    # LOGGING
+    # =========================
+
     def log(self, msg):
+        """
+        Safe from any thread.
+        """
         ts = datetime.now().strftime("%H:%M:%S")
-        self.console.insert("end", f"[{ts}] {msg}\n")
-        self.console.see("end")
+        self.log_queue.put(f"[{ts}] {msg}\n")
+
+        if self.file_log:
+            self.file_log.info(msg)
+
+    def call_soon(self, fn):
+        """
+        Runs fn on the Tk thread at the next drain.
+        """
+        self.ui_calls.put(fn)
+
+    def drain_ui(self):
+        try:
+            lines = []
+            while len(lines) < LOG_BATCH:
+                try:
+                    lines.append(self.log_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if lines:
+                self.console.insert("end", "".join(lines))
+
+                # keep only the newest LOG_MAX_LINES lines
+                count = int(self.console.index("end-1c").split(".")[0]) - 1
+                if count > LOG_MAX_LINES:
+                    self.console.delete("1.0", f"{count - LOG_MAX_LINES + 1}.0")
+
+                self.console.see("end")
+
+            # a queued call may destroy the window; the rest are dropped
+            while not self.closed:
+                try:
+                    fn = self.ui_calls.get_nowait()
+                except queue.Empty:
+                    break
+
+                try:
+                    fn()
+                except Exception as e:
+                    self.log(f"UI update failed: {e}")
+        finally:
+            if not self.closed:
+                self.after(LOG_INTERVAL_MS, self.drain_ui)
+
+    def destroy(self):
+        self.closed = True
+        super().destroy()
+
+    def set_file_log(self, enabled):
+        if not enabled:
+            if self.file_log:
+                for handler in list(self.file_log.handlers):
+                    self.file_log.removeHandler(handler)
+                    handler.close()
+            self.file_log = None
+            return
+
+        if self.file_log:
+            return
+
+        handler = logging.handlers.RotatingFileHandler(
+            LOG_FILE, maxBytes=1024 * 1024, backupCount=3, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(asctime)s %(threadName)s %(message)s"))
+
+        logger = logging.getLogger("liferpg.launcher")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.addHandler(handler)
+        self.file_log = logger
 
     # =========================
     # DEV SETTINGS
@@ -139,7 +859,7 @@ class Launcher(tk.Tk):
     def open_settings(self):
         win = tk.Toplevel(self)
         win.title("Launcher Settings")
-        win.geometry("350x240")
+        win.geometry("350x350")
 
         dev_var = tk.BooleanVar(value=self.cfg.get("dev_mode", False))
 
@@ -155,6 +875,21 @@ class Launcher(tk.Tk):
             command=toggle_dev
         ).pack(pady=10)
 
+        file_log_var = tk.BooleanVar(value=self.cfg.get("file_log", False))
+
+        def toggle_file_log():
+            self.cfg["file_log"] = file_log_var.get()
+            self.set_file_log(self.cfg["file_log"])
+            with open(CONFIG_FILE, "w", encoding="utf-8") as f:
+                json.dump(self.cfg, f, indent=4)
+
+        ttk.Checkbutton(
+            win,
+            text="Write Log File",
+            variable=file_log_var,
+            command=toggle_file_log
+        ).pack()
+
         ttk.Button(
             win,
             text="Select Local LifeRPG.exe...",
@@ -173,6 +908,18 @@ class Launcher(tk.Tk):
             command=self.print_debug_info
         ).pack(pady=5)
 
+        ttk.Button(
+            win,
+            text="Roll Back Last Update",
+            command=lambda: threading.Thread(target=self.rollback, daemon=True).start()
+        ).pack(pady=5)
+
+        ttk.Button(
+            win,
+            text="Verify Files (Full Rehash)",
+            command=lambda: threading.Thread(target=self.full_verify, daemon=True).start()
+        ).pack(pady=5)
+
     def select_and_launch_local_exe(self):
         file_path = filedialog.askopenfilename(
             title="Select LifeRPG.exe",
@@ -212,10 +959,37 @@ class Launcher(tk.Tk):
         threading.Thread(target=self.check_state, daemon=True).start()
 
     def check_state(self):
+        """
+        Offers an action straight from the cached release, if any, then
+        revalidates it in the background of this thread. Only a release
+        that actually changed re-evaluates the state.
+        """
+        cached = self.release_cache.get("release")
+
+        if cached:
+            self.log("Using cached release info; revalidating...")
+            self.latest_release = cached
+            self.evaluate_state()
+
         try:
             self.log("Checking GitHub release...")
-            self.latest_release = fetch_latest_release()
+            release, changed = fetch_latest_release(self.release_cache)
+        except Exception as e:
+            if cached:
+                self.log(f"Offline, staying on cached release info ({e}).")
+            else:
+                self.log(f"Startup error: {e}")
+            return
+
+        if cached and not changed:
+            self.log("Release info is current.")
+            return
 
+        self.latest_release = release
+        self.evaluate_state()
+
+    def evaluate_state(self):
+        try:
             latest_version = normalize_version(self.latest_release["tag_name"])
             installed_version = normalize_version(self.cfg["installed_version"])
 
@@ -232,7 +1006,7 @@ class Launcher(tk.Tk):
 
             if not self.verify_integrity():
                 self.log("Integrity failed. Repair required.")
-                self.set_action("Repair", self.install_full)
+                self.set_action("Repair", self.repair)
                 return
 
             self.set_action("Launch", self.launch)
@@ -253,14 +1027,19 @@ class Launcher(tk.Tk):
             self.log("Manifest missing from release.")
             return False
 
-        download(asset["browser_download_url"], RUNTIME_MANIFEST)
+        key = asset_key(asset)
+
+        if self.release_cache.get("manifest_key") != key or not os.path.exists(RUNTIME_MANIFEST):
+            download(asset["browser_download_url"], RUNTIME_MANIFEST)
+            self.release_cache["manifest_key"] = key
+            save_release_cache(self.release_cache)
 
         with open(RUNTIME_MANIFEST, "r", encoding="utf-8-sig") as f:
             self.manifest = json.load(f)
 
         return True
 
-    def verify_integrity(self):
+    def verify_integrity(self, full=False):
         install_path = self.install_dir.get()
         if not install_path:
             return False
@@ -268,29 +1047,77 @@ class Launcher(tk.Tk):
         if not self.load_manifest():
             return False
 
-        for rel, expected in self.manifest["files"].items():
+        problems = self.check_files(full=full, first_only=True)
+
+        for rel, problem in problems:
+            self.log(f"{problem}: {rel}")
+
+        if not problems:
+            self.log("Integrity verified.")
+        return not problems
+
+    def check_files(self, full=False, first_only=False, root=None):
+        """
+        Hashes manifest files on a thread pool and returns (rel, problem)
+        for each one that is missing or differs. Unless `full` is set,
+        files unchanged since their last hash are taken from the cache.
+        """
+        install_path = root or self.install_dir.get()
+
+        def check(rel, expected):
             fp = os.path.join(install_path, rel)
 
             if not os.path.exists(fp):
-                self.log(f"Missing file: {rel}")
-                return False
+                return rel, "Missing file"
 
-            if sha256(fp) != expected:
-                self.log(f"Hash mismatch: {rel}")
-                return False
+            if self.hash_cache.hash(fp, full) != expected:
+                return rel, "Hash mismatch"
 
-        self.log("Integrity verified.")
-        return True
+            return rel, None
+
+        problems = []
+        pool = ThreadPoolExecutor(max_workers=VERIFY_WORKERS)
+
+        try:
+            futures = [
+                pool.submit(check, rel, expected)
+                for rel, expected in self.manifest["files"].items()
+            ]
+
+            for future in as_completed(futures):
+                rel, problem = future.result()
+                if problem:
+                    problems.append((rel, problem))
+                    if first_only:
+                        break
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            self.hash_cache.save()
+
+        return sorted(problems)
+
+    def full_verify(self):
+        if not self.latest_release:
+            self.log("No release info yet.")
+            return
+
+        self.log("Full rehash of installed files...")
+
+        if self.verify_integrity(full=True):
+            self.set_action("Launch", self.launch)
+        else:
+            self.log("Integrity failed. Repair required.")
+            self.set_action("Repair", self.repair)
 
     # =========================
     # ACTIONS
     # =========================
 
     def set_action(self, text, command):
-        self.action_btn.config(
+        self.call_soon(lambda: self.action_btn.config(
             text=text,
             command=lambda: threading.Thread(target=command, daemon=True).start()
-        )
+        ))
 
     def download_asset(self, name):
         asset = next(
@@ -300,39 +1127,375 @@ class Launcher(tk.Tk):
         if not asset:
             return False
 
-        download(asset["browser_download_url"], ZIP_PATH)
+        key = asset_key(asset)
+        known = asset_digest(asset) or self.store.aliases.get(key)
+        cached = self.store.get(known)
+
+        if cached:
+            self.log(f"Using cached {name}.")
+            self.zip_path = cached
+            self.zip_source = (key, known)
+            return True
+
+        digest = download(
+            asset["browser_download_url"],
+            ZIP_PATH,
+            progress=self.report_progress,
+            expected_sha256=asset_digest(asset)
+        )
+        self.log(f"Downloaded {name} (sha256 {digest[:12]}...)")
+
+        # stored only once apply_zip has read it cleanly
+        self.zip_path = ZIP_PATH
+        self.zip_source = (key, digest)
         return True
 
-    def apply_zip(self):
+    def keep_archive(self):
+        key, digest = self.zip_source
+
+        if self.zip_path == ZIP_PATH:
+            self.zip_path = self.store.put_file(ZIP_PATH, digest)
+
+        with self.store.lock:
+            self.store.aliases[key] = digest
+            self.store.save()
+
+        if self.manifest:
+            self.store.index_archive(digest, self.manifest["files"])
+
+    def drop_archive(self):
+        """
+        Forgets an archive that failed to apply, so the next attempt
+        downloads it again instead of reusing it.
+        """
+        if self.zip_path == ZIP_PATH:
+            if os.path.exists(ZIP_PATH):
+                os.remove(ZIP_PATH)
+        elif self.zip_source:
+            self.store.discard(self.zip_source[1])
+
+    def apply_zip(self, target=None):
+        """
+        Streams zip members into target (the install dir by default) on
+        a thread pool, skipping members whose file already matches.
+        """
         try:
-            install_path = self.install_dir.get()
+            install_path = target or self.install_dir.get()
             os.makedirs(install_path, exist_ok=True)
 
-            with zipfile.ZipFile(ZIP_PATH) as z:
-                z.extractall(install_path)
-
-            self.log("Files applied.")
+            expected = {}
+            if self.manifest:
+                expected = {
+                    normalize_member(rel): digest
+                    for rel, digest in self.manifest["files"].items()
+                }
+
+            with zipfile.ZipFile(self.zip_path) as z:
+                members = [info for info in z.infolist() if not info.is_dir()]
+
+            # ZipFile handles are not shared between threads
+            local = threading.local()
+            handles = []
+            handles_lock = threading.Lock()
+
+            def extract(info):
+                fp = install_target(install_path, info.filename)
+                digest = expected.get(normalize_member(info.filename))
+
+                if self.member_unchanged(info, fp, digest):
+                    return 0, info.file_size
+
+                z = getattr(local, "zip", None)
+                if z is None:
+                    z = local.zip = zipfile.ZipFile(self.zip_path)
+                    with handles_lock:
+                        handles.append(z)
+
+                os.makedirs(os.path.dirname(fp), exist_ok=True)
+
+                tmp = fp + ".new"
+                with z.open(info) as src, open(tmp, "wb") as dst:
+                    shutil.copyfileobj(src, dst, HASH_BUFFER)
+                os.replace(tmp, fp)
+
+                return info.file_size, 0
+
+            try:
+                with ThreadPoolExecutor(max_workers=VERIFY_WORKERS) as pool:
+                    results = list(pool.map(extract, members))
+            finally:
+                for z in handles:
+                    z.close()
+
+            mb = 1024 * 1024
+            written = sum(w for w, _ in results)
+            skipped = sum(s for _, s in results)
+            self.log(
+                f"Files applied: {written / mb:.1f} MB written, "
+                f"{skipped / mb:.1f} MB already up to date."
+            )
+            self.keep_archive()
             return True
 
         except Exception as e:
             self.log(f"ZIP error: {e}")
+            self.drop_archive()
             return False
 
+    def member_unchanged(self, info, fp, digest=None):
+        """
+        Size first, then the manifest hash (cached) when known,
+        otherwise the member's CRC.
+        """
+        if not os.path.exists(fp) or os.path.getsize(fp) != info.file_size:
+            return False
+
+        if digest:
+            return self.hash_cache.hash(fp) == digest
+
+        return file_crc32(fp) == info.CRC
+
     def install_full(self):
+        self.load_manifest()
+
         self.log("Downloading full install...")
 
         if not self.download_asset(FULL_INSTALL_ZIP):
             self.log("Full install ZIP missing.")
             return
 
-        if self.apply_zip():
+        if self.staged_update(self.apply_zip):
             self.finalize_update()
 
+    # =========================
+    # STAGING
+    # =========================
+
+    def staging_paths(self):
+        install_path = os.path.normpath(self.install_dir.get())
+        return install_path, install_path + ".staging", install_path + ".previous"
+
+    def staged_update(self, apply):
+        """
+        Builds the new version next to the install: the current tree is
+        hard-linked into a staging dir, apply(staging) writes changed files
+        there as new files, and the result is verified against the manifest
+        before being renamed into place. The old tree is kept as .previous.
+        """
+        install_path, staging, previous = self.staging_paths()
+
+        try:
+            if os.path.exists(staging):
+                shutil.rmtree(staging)
+
+            if os.path.isdir(install_path):
+                link_tree(install_path, staging, skip=USER_DATA)
+            else:
+                os.makedirs(staging)
+
+            if not apply(staging):
+                raise ValueError("files could not be applied")
+
+            if self.manifest:
+                problems = self.check_files(root=staging)
+                for rel, problem in problems[:10]:
+                    self.log(f"Staged {problem.lower()}: {rel}")
+                if problems:
+                    raise ValueError("staged install failed verification")
+
+        except Exception as e:
+            self.log(f"Update aborted, install untouched: {e}")
+            shutil.rmtree(staging, ignore_errors=True)
+            return False
+
+        had_install = os.path.isdir(install_path)
+        carried = []
+        swapped_out = False
+
+        try:
+            if os.path.exists(previous):
+                shutil.rmtree(previous)
+
+            # saves follow the live install rather than staying in .previous
+            if had_install:
+                carried = move_user_data(install_path, staging)
+                os.rename(install_path, previous)
+                swapped_out = True
+
+            os.rename(staging, install_path)
+
+        except OSError as e:
+            # e.g. a file locked by the running game or an antivirus scan
+            self.log(f"Could not swap in update: {e}")
+            try:
+                if swapped_out:
+                    os.rename(previous, install_path)
+                if carried:
+                    move_user_data(staging, install_path)
+            except OSError as restore_error:
+                self.log(f"Could not restore the previous install: {restore_error}")
+            return False
+
+        self.hash_cache.rebase(staging, install_path)
+        self.hash_cache.save()
+        self.swapped_in = True
+        return True
+
+    def rollback(self):
+        install_path, _, previous = self.staging_paths()
+        previous_version = self.cfg.get("previous_version")
+
+        if not os.path.isdir(previous) or not previous_version:
+            self.log("No previous version to roll back to.")
+            return
+
+        failed = install_path + ".rolledback"
+        carried = []
+        swapped_out = False
+
+        try:
+            if os.path.exists(failed):
+                shutil.rmtree(failed)
+
+            # saves made since the update go back with the old version
+            carried = move_user_data(install_path, previous)
+            os.rename(install_path, failed)
+            swapped_out = True
+            os.rename(previous, install_path)
+
+        except OSError as e:
+            self.log(f"Rollback failed, install untouched: {e}")
+            try:
+                if swapped_out:
+                    os.rename(failed, install_path)
+                if carried:
+                    move_user_data(previous, install_path)
+            except OSError as restore_error:
+                self.log(f"Could not restore the install: {restore_error}")
+            return
+
+        shutil.rmtree(failed, ignore_errors=True)
+
+        self.cfg["installed_version"] = previous_version
+        self.cfg["previous_version"] = ""
+        with open(CONFIG_FILE, "w") as f:
+            json.dump(self.cfg, f, indent=4)
+
+        self.log(f"Rolled back to {previous_version}.")
+        self.set_action("Launch", self.launch)
+
+    def delta_update(self):
+        """
+        Fetches only the files that differ from the new manifest, as
+        ranges of the full install zip, into a staged install.
+        """
+        if not self.install_dir.get() or not self.load_manifest():
+            return False
+
+        changed = [rel for rel, _ in self.check_files()]
+        if not changed:
+            self.log("Installed files already match the new manifest.")
+            return True
+
+        asset = next(
+            (a for a in self.latest_release["assets"] if a["name"] == FULL_INSTALL_ZIP),
+            None
+        )
+        if not asset:
+            return False
+
+        files = self.manifest["files"]
+        remote_needed = [rel for rel in changed if not self.store.can_provide(files[rel])]
+
+        self.log(
+            f"Delta update: {len(changed)} changed file(s), "
+            f"{len(changed) - len(remote_needed)} from local cache."
+        )
+
+        remote = None
+        if remote_needed:
+            try:
+                remote = RemoteZip(asset["browser_download_url"])
+            except (RangeUnsupported, ValueError, OSError, urllib.error.URLError) as e:
+                self.log(f"Delta update unavailable: {e}")
+                return False
+
+        def fetch(staging):
+            for rel in changed:
+                data = self.store.read_file(files[rel])
+
+                if data is None:
+                    data = remote.read(rel)
+                    if hashlib.sha256(data).hexdigest() != files[rel]:
+                        raise ValueError(f"downloaded {rel} does not match manifest")
+                    self.store.put_bytes(data, files[rel])
+
+                self.write_staged(staging, rel, data)
+
+            self.log("Files applied.")
+            return True
+
+        return self.staged_update(fetch)
+
+    def write_staged(self, staging, rel, data):
+        if data is None:
+            raise ValueError(f"no data for {rel}")
+
+        fp = install_target(staging, rel)
+        os.makedirs(os.path.dirname(fp), exist_ok=True)
+
+        # replace the link, never write through it
+        with open(fp + ".new", "wb") as f:
+            f.write(data)
+        os.replace(fp + ".new", fp)
+
+    def repair(self):
+        try:
+            if self.repair_from_cache():
+                self.finalize_update()
+                return
+        except Exception as e:
+            self.log(f"Cache repair failed: {e}")
+
+        self.install_full()
+
+    def repair_from_cache(self):
+        """
+        Restores missing or damaged files from the asset store without
+        touching the network, if every one of them is available there.
+        """
+        if not self.install_dir.get() or not self.load_manifest():
+            return False
+
+        files = self.manifest["files"]
+        broken = [rel for rel, _ in self.check_files(full=True)]
+        if not broken:
+            self.log("All files intact.")
+            return True
+
+        if not all(self.store.can_provide(files[rel]) for rel in broken):
+            return False
+
+        self.log(f"Repairing {len(broken)} file(s) from local cache...")
+
+        def fill(staging):
+            for rel in broken:
+                self.write_staged(staging, rel, self.store.read_file(files[rel]))
+            return True
+
+        return self.staged_update(fill)
+
     def update_game(self):
+        self.log("Attempting delta update...")
+
+        if self.delta_update():
+            self.finalize_update()
+            return
+
         self.log("Attempting patch update...")
 
         if self.download_asset(PATCH_ZIP):
-            if self.apply_zip():
+            if self.staged_update(self.apply_zip):
                 self.finalize_update()
                 return
 
@@ -341,6 +1504,11 @@ class Launcher(tk.Tk):
 
     def finalize_update(self):
         new_version = normalize_version(self.latest_release["tag_name"])
+
+        # no-op updates keep .previous, and so the version it holds
+        if self.swapped_in:
+            self.cfg["previous_version"] = self.cfg.get("installed_version", "")
+            self.swapped_in = False
         self.cfg["installed_version"] = new_version
 
         with open(CONFIG_FILE, "w") as f:
@@ -365,7 +1533,7 @@ class Launcher(tk.Tk):
             return
 
         subprocess.Popen([exe], cwd=self.install_dir.get())
-        self.destroy()
+        self.call_soon(self.destroy)
 
 
 if __name__ == "__main__":
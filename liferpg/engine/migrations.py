@@ -0,0 +1,65 @@
+import copy
+from .schema import SCHEMA_VERSION, DEFAULT_PLAYER
+
+# from_version -> function upgrading data in place to from_version + 1
+MIGRATIONS = {}
+
+
+def migration(from_version):
+    def register(fn):
+        MIGRATIONS[from_version] = fn
+        return fn
+    return register
+
+
+def migrate(data):
+    """
+    Runs every migration between the save's schema_version and
+    SCHEMA_VERSION, in order. Returns True if anything ran.
+    """
+    version = data.get("schema_version", 0)
+    if version >= SCHEMA_VERSION:
+        return False
+
+    while version < SCHEMA_VERSION:
+        MIGRATIONS[version](data)
+        version += 1
+        data["schema_version"] = version
+
+    return True
+
+
+def _backfill_defaults(data):
+    for key, value in DEFAULT_PLAYER.items():
+        if key not in data:
+            data[key] = copy.deepcopy(value)
+
+
+# -------------------------
+# Migrations
+# -------------------------
+
+@migration(0)
+def _v0_add_missing_keys(data):
+    _backfill_defaults(data)
+
+
+@migration(1)
+def _v1_normalize_quests(data):
+    """
+    v1 saves were back-filled on every load and never touched nested
+    quest records; fill both in once.
+    """
+    _backfill_defaults(data)
+
+    for qid, quest in data["quests"].items():
+        quest.setdefault("id", qid)
+        quest.setdefault("name", qid)
+        quest.setdefault("description", "")
+        quest.setdefault("status", "active")
+        quest.setdefault("objectives", [])
+        quest.setdefault("rewards", {})
+
+        for obj in quest["objectives"]:
+            obj.setdefault("current", 0)
+            obj.setdefault("completed", False)
@@ -11,16 +11,21 @@ class Objective:
             return
 
         if self.type == "complete_task":
-            self.current += 1
-            self._check_complete()
+            self.progress(1)
 
     def notify_navigation_data(self, amount):
         if self.completed:
             return
 
         if self.type == "accumulate_navigation_data":
-            self.current += amount
-            self._check_complete()
+            self.progress(amount)
+
+    def progress(self, amount):
+        if self.completed:
+            return
+
+        self.current += amount
+        self._check_complete()
 
     def _check_complete(self):
         if self.current >= self.target:
@@ -1,52 +1,116 @@
+import functools
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from .save import load_player, save_player
-from .progression import xp_required_for_rank
+from .save import DEFAULT_PROFILE, get_store, SaveScheduler
+from .progression import resolve_rank
 from .quest_manager import QuestManager
 
 
+def synchronized(method):
+    """
+    Runs the method under the player's lock, so it is atomic with
+    respect to every other synchronized call and to background saves.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class Player:
+    """
+    Public operations are serialized on a per-instance reentrant lock,
+    which the save scheduler shares, so a write never sees half an
+    operation. Use transaction() to make several calls (or direct
+    QuestManager calls) one atomic operation.
+    """
+
+    def __init__(self, save_window=0.0, journal=True, profile_id=DEFAULT_PROFILE, store=None):
+        self.profile_id = profile_id
+        self.store = store or get_store()
+        self.data = self.store.load(profile_id)
+        self.lock = threading.RLock()
+
+        # incremental writer (journal / changed rows), or full saves
+        self.journal = self.store.open_writer(profile_id, self.data) if journal else None
+        self.saver = SaveScheduler(
+            window=save_window,
+            writer=self.journal.append if self.journal else self._save_full,
+            lock=self.lock
+        )
 
-    def __init__(self):
-        self.data = load_player()
-        self.daily_recovery()
-        self.recalculate_rank()
+        with self.saver.operation():
+            self.daily_recovery()
+            self.recalculate_rank()
+
+            # Attach Quest Manager
+            self.quest_manager = QuestManager(self)
 
-        # Attach Quest Manager
-        self.quest_manager = QuestManager(self)
+    @contextmanager
+    def transaction(self, event=None):
+        with self.lock, self.saver.operation(event):
+            yield self
 
     # -------------------------
     # Task Completion Entry Point
     # -------------------------
 
+    @synchronized
     def complete_task(self, task):
         """
         Unified task completion pipeline.
         """
         xp = task.xp_reward()
 
-        # Apply XP normally (with quest notifications)
-        self.gain_navigation_data(xp)
+        with self.saver.operation("complete_task"):
+            # Apply XP normally (with quest notifications)
+            self.gain_navigation_data(xp)
 
-        # Notify quest that a task was completed
-        self.quest_manager.notify_task_completed(task)
+            # Notify quest that a task was completed
+            self.quest_manager.notify_task_completed(task)
 
-        self.save()
+            self.save()
+
+    @synchronized
+    def complete_tasks(self, tasks):
+        """
+        Batched task completion. Ends in the same state as calling
+        complete_task for each task in order, with one quest pass,
+        one rank recalculation and one save.
+        """
+        amounts = [task.xp_reward() for task in tasks]
+        if not amounts:
+            return
+
+        with self.saver.operation("complete_tasks"):
+            self.data["total_navigation_data"] += sum(amounts)
+            self.data["credits"] += sum(xp // 5 for xp in amounts)
+            self.data["warp_stability"] += len(amounts)
+            self.recalculate_rank()
+
+            self.quest_manager.notify_tasks_completed(amounts)
+
+            self.save()
 
     # -------------------------
     # Progression
     # -------------------------
 
+    @synchronized
     def gain_navigation_data(self, amount):
         """
         Public XP pipeline (used for tasks).
         This notifies quests.
         """
-        self._apply_navigation_data(amount)
+        with self.saver.operation():
+            self._apply_navigation_data(amount)
 
-        # Notify quests tracking navigation data
-        self.quest_manager.notify_navigation_data(amount)
+            # Notify quests tracking navigation data
+            self.quest_manager.notify_navigation_data(amount)
 
-        self.save()
+            self.save()
 
     def _apply_navigation_data(self, amount):
         """
@@ -59,47 +123,45 @@ class Player:
 
         self.recalculate_rank()
 
+    @synchronized
     def recalculate_rank(self):
-        total = self.data["total_navigation_data"]
-
-        rank = 1
-        remaining = total
-
-        while True:
-            required = xp_required_for_rank(rank)
-            if remaining >= required:
-                remaining -= required
-                rank += 1
-            else:
-                break
+        rank, remaining, required = resolve_rank(
+            self.data["total_navigation_data"]
+        )
 
         self.data["rank"] = rank
         self.data["current_navigation_data"] = remaining
-        self.data["next_rank_requirement"] = xp_required_for_rank(rank)
+        self.data["next_rank_requirement"] = required
 
     # -------------------------
     # Failure System
     # -------------------------
 
+    @synchronized
     def fail_task(self, task):
-        self.data["ship_integrity"] -= task.integrity_penalty()
-        self.data["warp_stability"] = 0
+        with self.saver.operation("fail_task"):
+            self.data["ship_integrity"] -= task.integrity_penalty()
+            self.data["warp_stability"] = 0
 
-        if self.data["ship_integrity"] <= 0:
-            self.critical_failure()
+            if self.data["ship_integrity"] <= 0:
+                self.critical_failure()
 
-        self.save()
+            self.save()
 
+    @synchronized
     def critical_failure(self):
-        self.data["credits"] = int(self.data["credits"] * 0.8)
-        self.data["ship_integrity"] = 60
-        self.data["warp_stability"] = 0
-        self.data["last_emergency_repair_date"] = str(datetime.today().date())
+        with self.saver.operation("critical_failure"):
+            self.data["credits"] = int(self.data["credits"] * 0.8)
+            self.data["ship_integrity"] = 60
+            self.data["warp_stability"] = 0
+            self.data["last_emergency_repair_date"] = str(datetime.today().date())
+            self.save()
 
     # -------------------------
     # Daily Recovery
     # -------------------------
 
+    @synchronized
     def daily_recovery(self):
         today = str(datetime.today().date())
         last = self.data.get("last_active_date")
@@ -116,33 +178,59 @@ class Player:
     # Dev Tools
     # -------------------------
 
+    @synchronized
     def dev_add_xp(self, amount):
-        self.gain_navigation_data(amount)
+        with self.saver.operation("dev_add_xp"):
+            self.gain_navigation_data(amount)
 
+    @synchronized
     def dev_damage(self, amount):
-        self.data["ship_integrity"] -= amount
-        if self.data["ship_integrity"] <= 0:
-            self.critical_failure()
-        self.save()
+        with self.saver.operation("dev_damage"):
+            self.data["ship_integrity"] -= amount
+            if self.data["ship_integrity"] <= 0:
+                self.critical_failure()
+            self.save()
 
+    @synchronized
     def dev_heal(self, amount):
-        self.data["ship_integrity"] = min(
-            self.data["ship_integrity"] + amount,
-            self.data["max_integrity"]
-        )
-        self.save()
+        with self.saver.operation("dev_heal"):
+            self.data["ship_integrity"] = min(
+                self.data["ship_integrity"] + amount,
+                self.data["max_integrity"]
+            )
+            self.save()
 
+    @synchronized
     def dev_add_credits(self, amount):
-        self.data["credits"] += amount
-        self.save()
+        with self.saver.operation("dev_add_credits"):
+            self.data["credits"] += amount
+            self.save()
 
+    @synchronized
     def dev_reset_integrity(self):
-        self.data["ship_integrity"] = self.data["max_integrity"]
-        self.save()
+        with self.saver.operation("dev_reset_integrity"):
+            self.data["ship_integrity"] = self.data["max_integrity"]
+            self.save()
 
     # -------------------------
     # Save Wrapper
     # -------------------------
 
-    def save(self):
-        save_player(self.data)
+    @synchronized
+    def save(self, event=None):
+        """
+        Marks state dirty; the save scheduler decides when to write.
+        """
+        self.saver.mark_dirty(self.data, event)
+
+    def _save_full(self, data, events):
+        self.store.save(self.profile_id, data)
+
+    @synchronized
+    def flush(self):
+        """
+        Forces any pending write to disk (call on shutdown).
+        """
+        self.saver.flush()
+        if self.journal:
+            self.journal.close()
@@ -1,2 +1,63 @@
+from bisect import bisect_right
+
+
 def xp_required_for_rank(rank):
     return int(50 * (1.5 ** (rank - 1)))
+
+
+class ProgressionTable:
+    """
+    Cumulative XP thresholds, grown lazily as players climb.
+    thresholds[i] is the total XP needed to leave rank i + 1.
+    """
+
+    def __init__(self, initial_ranks=64):
+        self.thresholds = []
+        self._extend_to_rank(initial_ranks)
+
+    def _extend_to_rank(self, rank):
+        total = self.thresholds[-1] if self.thresholds else 0
+
+        for r in range(len(self.thresholds) + 1, rank + 1):
+            total += xp_required_for_rank(r)
+            self.thresholds.append(total)
+
+    def _ensure_covers(self, total):
+        while self.thresholds[-1] <= total:
+            self._extend_to_rank(len(self.thresholds) * 2)
+
+    def rank_for(self, total):
+        self._ensure_covers(total)
+        return bisect_right(self.thresholds, total) + 1
+
+    def resolve(self, total):
+        """
+        Returns (rank, current_navigation_data, next_rank_requirement).
+        """
+        rank = self.rank_for(total)
+        floor = self.thresholds[rank - 2] if rank > 1 else 0
+        required = self.thresholds[rank - 1] - floor
+        return rank, total - floor, required
+
+    def ranks_for(self, totals):
+        """
+        Batched rank lookup for many XP totals.
+        """
+        totals = list(totals)
+        if not totals:
+            return []
+
+        self._ensure_covers(max(totals))
+        thresholds = self.thresholds
+        return [bisect_right(thresholds, t) + 1 for t in totals]
+
+
+TABLE = ProgressionTable()
+
+
+def resolve_rank(total):
+    return TABLE.resolve(total)
+
+
+def ranks_for(totals):
+    return TABLE.ranks_for(totals)
@@ -1,3 +1,5 @@
+from bisect import bisect_left
+from itertools import accumulate
 from .quest import Quest
 from .objective import Objective
 
@@ -7,6 +9,17 @@ class QuestManager:
         self.player = player
         self.quests = {}
 
+        # objective type -> {(quest id, objective id): (quest, objective)}
+        # holding only incomplete objectives of active quests
+        self._live = {}
+        # quest id -> quest, completed but rewards not yet applied
+        self._unrewarded = {}
+        # quest ids whose saved dict is stale
+        self._dirty = set()
+        self._position = {}
+        # quest id -> change counter, so views can skip unchanged quests
+        self.revisions = {}
+
         self.load_or_initialize()
 
     # -------------------------
@@ -15,12 +28,13 @@ class QuestManager:
 
     def load_or_initialize(self):
         saved = self.player.data.get("quests", {})
+        self.player.data["quests"] = dict(saved)
 
         if not saved:
             self.initialize_default_quests()
         else:
             for qid, qdata in saved.items():
-                self.quests[qid] = Quest.from_dict(qdata)
+                self._add(Quest.from_dict(qdata))
 
     def initialize_default_quests(self):
         quest = Quest(
@@ -37,53 +51,211 @@ class QuestManager:
             }
         )
 
-        self.quests[quest.id] = quest
+        self.add_quest(quest)
+
+    # -------------------------
+    # Quest Lifecycle
+    # -------------------------
+
+    def add_quest(self, quest):
+        self._add(quest)
+        self._touch(quest.id)
         self.save()
 
+    def remove_quest(self, quest_id):
+        quest = self.quests.pop(quest_id)
+        self._unindex(quest)
+        self._touch(quest_id)
+        self.save()
+
+    def set_quest_status(self, quest_id, status):
+        quest = self.quests[quest_id]
+        self._unindex(quest)
+        quest.status = status
+        self._index(quest)
+        self._touch(quest_id)
+        self.save()
+
+    def _touch(self, quest_id):
+        self._dirty.add(quest_id)
+        self.revisions[quest_id] = self.revisions.get(quest_id, 0) + 1
+
+    def _add(self, quest):
+        if quest.id in self.quests:
+            self._unindex(self.quests[quest.id])
+        else:
+            self._position[quest.id] = len(self._position)
+
+        self.quests[quest.id] = quest
+        self.revisions.setdefault(quest.id, 0)
+        self._index(quest)
+
+    def _index(self, quest):
+        if quest.status == "active":
+            incomplete = [obj for obj in quest.objectives if not obj.completed]
+            for obj in incomplete:
+                self._live.setdefault(obj.type, {})[(quest.id, obj.id)] = (quest, obj)
+
+            if incomplete:
+                return
+
+            # no objective left to notify, so it would never complete otherwise
+            quest.check_completion()
+            self._touch(quest.id)
+
+        if quest.is_completed() and not quest.rewards.get("_applied", False):
+            self._unrewarded[quest.id] = quest
+
+    def _unindex(self, quest):
+        for obj in quest.objectives:
+            self._live.get(obj.type, {}).pop((quest.id, obj.id), None)
+
+        self._unrewarded.pop(quest.id, None)
+
     # -------------------------
     # Notifications
     # -------------------------
 
     def notify_task_completed(self, task):
-        for quest in self.quests.values():
-            quest.notify_task_completed(task)
-
+        self._dispatch("complete_task", lambda obj: obj.notify_task_completed(task))
         self.save()
 
     def notify_navigation_data(self, amount):
-        for quest in self.quests.values():
-            quest.notify_navigation_data(amount)
-
+        self._dispatch("accumulate_navigation_data", lambda obj: obj.notify_navigation_data(amount))
         self.apply_completed_rewards()
         self.save()
 
+    def _dispatch(self, objective_type, notify):
+        """
+        Notifies only the live objectives of one type; finished objectives
+        and quests drop out of the index as they complete.
+        """
+        live = self._live.get(objective_type)
+        if not live:
+            return
+
+        touched = {}
+
+        for key, (quest, obj) in list(live.items()):
+            notify(obj)
+            touched[quest.id] = quest
+
+            if obj.completed:
+                del live[key]
+
+        for quest in touched.values():
+            quest.check_completion()
+
+            if quest.is_completed():
+                self._unindex(quest)
+                self._index(quest)
+
+            self._touch(quest.id)
+
+    def notify_tasks_completed(self, amounts):
+        """
+        Batched form of notify_navigation_data(amount) followed by
+        notify_task_completed(task) for each task, given the navigation
+        data of each task in completion order. Reaches the same state,
+        including which rewards are applied and in what order.
+        """
+        n = len(amounts)
+        if not n:
+            return
+
+        # Sequential events are numbered: task k's navigation data is
+        # 2k - 1, its completion notice 2k. Rewards are only applied on
+        # navigation data events, so the last one that can pay out is 2n - 1.
+        prefix = list(accumulate(amounts))
+        last_payout = 2 * n - 1
+
+        payouts = [(1, q) for q in self._unrewarded.values()]
+        self._unrewarded.clear()
+
+        finished_at = {}
+        touched = {}
+
+        nav = self._live.get("accumulate_navigation_data", {})
+        for key, (quest, obj) in list(nav.items()):
+            event = 2 * bisect_left(prefix, obj.target - obj.current) + 1
+            obj.progress(prefix[-1])
+            touched[quest.id] = quest
+
+            if obj.completed:
+                del nav[key]
+                finished_at[quest.id] = max(finished_at.get(quest.id, 0), event)
+
+        done = self._live.get("complete_task", {})
+        for key, (quest, obj) in list(done.items()):
+            event = 2 * max(obj.target - obj.current, 1)
+            obj.progress(n)
+            touched[quest.id] = quest
+
+            if obj.completed:
+                del done[key]
+                finished_at[quest.id] = max(finished_at.get(quest.id, 0), event)
+
+        for quest in touched.values():
+            quest.check_completion()
+            self._touch(quest.id)
+
+            if not quest.is_completed():
+                continue
+
+            self._unindex(quest)
+            event = finished_at[quest.id]
+            payout = event if event % 2 else event + 1
+
+            if payout <= last_payout:
+                payouts.append((payout, quest))
+            else:
+                self._index(quest)
+
+        payouts.sort(key=lambda p: (p[0], self._position[p[1].id]))
+        self._apply_rewards([quest for _, quest in payouts])
+        self.save()
+
     # -------------------------
     # Reward Application
     # -------------------------
 
     def apply_completed_rewards(self):
-        for quest in self.quests.values():
-            if quest.is_completed() and not quest.rewards.get("_applied", False):
+        pending = sorted(self._unrewarded.values(), key=lambda q: self._position[q.id])
+        self._unrewarded.clear()
+        self._apply_rewards(pending)
 
-                rewards = quest.rewards
+    def _apply_rewards(self, quests):
+        for quest in quests:
+            rewards = quest.rewards
 
-                # Apply XP WITHOUT triggering quest notifications again
-                if "navigation_data" in rewards:
-                    self.player._apply_navigation_data(
-                        rewards["navigation_data"]
-                    )
+            # Apply XP WITHOUT triggering quest notifications again
+            if "navigation_data" in rewards:
+                self.player._apply_navigation_data(
+                    rewards["navigation_data"]
+                )
 
-                if "credits" in rewards:
-                    self.player.data["credits"] += rewards["credits"]
+            if "credits" in rewards:
+                self.player.data["credits"] += rewards["credits"]
 
-                quest.rewards["_applied"] = True
+            quest.rewards["_applied"] = True
+            self._touch(quest.id)
+            self.player.save(event=f"quest_reward:{quest.id}")
 
     # -------------------------
     # Save
     # -------------------------
 
     def save(self):
-        self.player.data["quests"] = {
-            qid: quest.to_dict() for qid, quest in self.quests.items()
-        }
+        """
+        Re-serializes only the quests that changed since the last save.
+        """
+        saved = self.player.data["quests"]
+
+        for qid in self._dirty:
+            if qid in self.quests:
+                saved[qid] = self.quests[qid].to_dict()
+            else:
+                saved.pop(qid, None)
+
+        self._dirty.clear()
         self.player.save()
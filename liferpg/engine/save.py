@@ -1,28 +1,546 @@
+import io
 import os
+import re
+import sys
+import copy
+import gzip
 import json
-from .schema import DEFAULT_PLAYER
+import pickle
+import threading
+from contextlib import contextmanager
+from .schema import new_player
+from .migrations import migrate
 
-SAVE_DIR = "life_rpg_save"
+
+def default_save_dir():
+    """
+    LIFERPG_SAVE_DIR if set, otherwise life_rpg_save next to the game
+    (the executable when frozen, the project root from source) rather
+    than wherever the process happened to be started.
+    """
+    if os.environ.get("LIFERPG_SAVE_DIR"):
+        return os.path.abspath(os.environ["LIFERPG_SAVE_DIR"])
+
+    if getattr(sys, "frozen", False):
+        base = os.path.dirname(sys.executable)
+    else:
+        base = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    return os.path.join(base, "life_rpg_save")
+
+
+SAVE_DIR = default_save_dir()
 PLAYER_FILE = os.path.join(SAVE_DIR, "player.json")
 
-os.makedirs(SAVE_DIR, exist_ok=True)
+DEFAULT_PROFILE = "default"
+PROFILE_ID = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9_.-]{0,63}$")
+
+# codec used for new writes; existing files are detected by header
+SAVE_CODEC = "json"
+
+# storage backend used by load_player/save_player: "json" or "sqlite"
+STORE_BACKEND = os.environ.get("LIFERPG_STORE", "json")
+
+
+# -------------------------
+# Codecs
+# -------------------------
+
+class JsonCodec:
+    """
+    Compact JSON. Also reads the old indent=4 files, which have no header.
+    """
+    name = "json"
+    magic = None
+
+    def encode(self, data):
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, raw):
+        return json.loads(raw.decode("utf-8-sig"))
+
+
+class GzipJsonCodec:
+    name = "gzip"
+    magic = b"\x1f\x8b"
+
+    def encode(self, data):
+        return gzip.compress(JsonCodec().encode(data), compresslevel=6)
+
+    def decode(self, raw):
+        return JsonCodec().decode(gzip.decompress(raw))
+
+
+class PlainUnpickler(pickle.Unpickler):
+    """
+    Only the built-in containers and scalars a save holds; anything that
+    would import a class or call a function is refused.
+    """
+
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"refusing to load {module}.{name}")
+
+
+class BinaryCodec:
+    """
+    Pickle protocol 4 behind a magic header; the format stays readable
+    by every later Python. Fast to load and save, but not human readable.
+    """
+    name = "binary"
+    magic = b"LRPB\x01"
+
+    def encode(self, data):
+        return self.magic + pickle.dumps(data, protocol=4)
+
+    def decode(self, raw):
+        return PlainUnpickler(io.BytesIO(raw[len(self.magic):])).load()
+
+
+CODECS = {codec.name: codec for codec in (JsonCodec(), GzipJsonCodec(), BinaryCodec())}
+
+
+def detect_codec(raw):
+    for codec in CODECS.values():
+        if codec.magic and raw.startswith(codec.magic):
+            return codec
+    return CODECS["json"]
+
+
+def encode_player(data, codec=None):
+    return CODECS[codec or SAVE_CODEC].encode(data)
+
+
+def decode_player(raw):
+    return detect_codec(raw).decode(raw)
+
+
+def read_snapshot(path=PLAYER_FILE):
+    return read_snapshot_codec(path)[0]
+
+
+def read_snapshot_codec(path=PLAYER_FILE):
+    """
+    Returns (data, codec name), or (None, None) if there is no snapshot.
+    """
+    if not os.path.exists(path):
+        return None, None
+
+    with open(path, "rb") as f:
+        raw = f.read()
+
+    codec = detect_codec(raw)
+    return codec.decode(raw), codec.name
+
+
+def write_snapshot(data, path=PLAYER_FILE, codec=None):
+    _write_atomic(path, encode_player(data, codec))
+
+
+# -------------------------
+# Load / Save
+# -------------------------
+
+_store = None
+_store_lock = threading.Lock()
+_profile_locks = {}
+
+
+def get_store():
+    """
+    Process-wide store for STORE_BACKEND, created on first use.
+    """
+    global _store
+
+    with _store_lock:
+        if _store is None:
+            if STORE_BACKEND == "sqlite":
+                from .sqlite_store import SqliteStore
+                _store = SqliteStore()
+            else:
+                _store = JsonStore()
+        return _store
+
+
+def set_store(store):
+    global _store
+
+    with _store_lock:
+        _store = store
+
+
+def profile_lock(directory):
+    """
+    One lock per save directory, shared by JsonStore and the Journal
+    writing there, so a full snapshot write never interleaves with an
+    append or a compaction.
+    """
+    key = os.path.abspath(directory)
+    with _store_lock:
+        return _profile_locks.setdefault(key, threading.RLock())
+
+
+def load_player(profile_id=DEFAULT_PROFILE, store=None):
+    return (store or get_store()).load(profile_id)
+
+
+def save_player(data, profile_id=DEFAULT_PROFILE, store=None):
+    (store or get_store()).save(profile_id, data)
+
+
+def check_profile_id(profile_id):
+    if not PROFILE_ID.match(profile_id):
+        raise ValueError(f"Invalid profile id: {profile_id!r}")
+    return profile_id
+
+
+class JsonStore:
+    """
+    Default backend: a snapshot plus journal per profile. The default
+    profile keeps the original life_rpg_save/player.json layout; others
+    live under profiles/<id>/.
+    """
+
+    def __init__(self, root=SAVE_DIR):
+        self.root = root
+
+    def profile_dir(self, profile_id):
+        if profile_id == DEFAULT_PROFILE:
+            return self.root
+        return os.path.join(self.root, "profiles", check_profile_id(profile_id))
+
+    def load(self, profile_id=DEFAULT_PROFILE):
+        directory = self.profile_dir(profile_id)
+        player_file = os.path.join(directory, "player.json")
+        journal_file = os.path.join(directory, "player.journal")
+        compacting_file = journal_file + ".compacting"
+
+        # a new profile has only a journal until its first compaction
+        data, codec = read_snapshot_codec(player_file)
+        if data is None:
+            data = new_player()
+
+        # journal tail: a rotated-out log first, then the live one
+        for path in (compacting_file, journal_file):
+            for record in read_journal(path):
+                apply_record(data, record)
+
+        # persist an upgrade so later loads skip it; with the journal on,
+        # snapshots are otherwise only rewritten at compaction, so a
+        # codec change is applied here rather than on the next save
+        if migrate(data) or (codec is not None and codec != SAVE_CODEC):
+            self._write_full(directory, data)
+
+        return data
+
+    def save(self, profile_id, data):
+        self._write_full(self.profile_dir(profile_id), data)
+
+    def _write_full(self, directory, data):
+        """
+        Writes a snapshot and drops the journal files it supersedes;
+        left in place they would replay older values over it.
+        """
+        with profile_lock(directory):
+            write_snapshot(data, os.path.join(directory, "player.json"))
+
+            journal_file = os.path.join(directory, "player.journal")
+            for path in (journal_file + ".compacting", journal_file):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def open_writer(self, profile_id, data):
+        return Journal(data, directory=self.profile_dir(profile_id))
+
+    def close(self):
+        pass
+
+
+def _write_atomic(path, raw):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(raw)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+# -------------------------
+# Journal
+# -------------------------
+
+def read_journal(path):
+    if not os.path.exists(path):
+        return
+
+    for record, _ in _journal_lines(path):
+        yield record
+
+
+def readable_length(path):
+    """
+    Bytes up to the end of the last record read_journal() returns.
+    """
+    return sum(size for _, size in _journal_lines(path))
+
+
+def _journal_lines(path):
+    with open(path, "rb") as f:
+        for line in f:
+            # torn tail from a crash mid-append
+            if not line.endswith(b"\n"):
+                return
+            try:
+                record = json.loads(line)
+            except ValueError:
+                return
+            yield record, len(line)
+
+
+def apply_record(data, record):
+    """
+    Records hold absolute values, so replaying one twice is harmless.
+    """
+    data.update(record.get("set", {}))
+
+    for key in record.get("unset", []):
+        data.pop(key, None)
+
+    if "quests" in record or "quests_removed" in record:
+        quests = data.setdefault("quests", {})
+        quests.update(record.get("quests", {}))
+        for qid in record.get("quests_removed", []):
+            quests.pop(qid, None)
+
+
+def diff_state(last, data, advance=True):
+    """
+    Patch record turning `last` into `data`. Quests are compared one by
+    one. With advance=False `last` is left as is, for writers that must
+    only move it forward (apply_record) once the record is stored.
+    """
+    record = {}
+
+    changed = {
+        k: copy.deepcopy(v) for k, v in data.items()
+        if k != "quests" and (k not in last or last[k] != v)
+    }
+    removed = [k for k in last if k not in data]
+
+    quests = data.get("quests", {})
+    last_quests = last.get("quests", {})
+    changed_quests = {
+        qid: copy.deepcopy(q) for qid, q in quests.items()
+        if qid not in last_quests or last_quests[qid] != q
+    }
+    removed_quests = [qid for qid in last_quests if qid not in quests]
+
+    if changed:
+        record["set"] = changed
+    if removed:
+        record["unset"] = removed
+    if changed_quests:
+        record["quests"] = changed_quests
+    if removed_quests:
+        record["quests_removed"] = removed_quests
+
+    if advance:
+        apply_record(last, record)
+    return record
+
+
+class Journal:
+    """
+    Append-only log of per-operation state patches on top of the
+    player.json snapshot. Once the log passes `compact_bytes` it is
+    rotated out and folded into a new snapshot on a background thread.
+    """
+
+    def __init__(self, data, directory=SAVE_DIR, compact_bytes=256 * 1024, fsync=True):
+        self.player_file = os.path.join(directory, "player.json")
+        self.journal_file = os.path.join(directory, "player.journal")
+        self.compacting_file = self.journal_file + ".compacting"
+        self.compact_bytes = compact_bytes
+        self.fsync = fsync
+
+        self._last = copy.deepcopy(data)
+        self._lock = profile_lock(directory)
+        self._compactor = None
+
+        os.makedirs(directory, exist_ok=True)
+
+        with self._lock:
+            if os.path.exists(self.compacting_file):
+                # a previous compaction was interrupted; data already has it
+                self._write_snapshot(encode_player(data))
+
+            # cut a torn tail from a crash mid-append, or later records
+            # would be written onto the end of it and never read back
+            if os.path.exists(self.journal_file):
+                length = readable_length(self.journal_file)
+                if length < os.path.getsize(self.journal_file):
+                    with open(self.journal_file, "r+b") as f:
+                        f.truncate(length)
+                        f.flush()
+                        os.fsync(f.fileno())
+
+        self._size = (
+            os.path.getsize(self.journal_file) if os.path.exists(self.journal_file) else 0
+        )
+
+    def append(self, data, events=()):
+        with self._lock:
+            record = diff_state(self._last, data, advance=False)
+            if not record:
+                return
+
+            if events:
+                record["events"] = list(events)
+
+            line = json.dumps(record, separators=(",", ":")) + "\n"
+            with open(self.journal_file, "a") as f:
+                f.write(line)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+
+            # only now is the change on disk; a failed write is retried
+            # in full by the next append
+            apply_record(self._last, record)
+            self._size += len(line)
+
+            if (
+                self._size >= self.compact_bytes
+                and self._compactor is None
+                and not os.path.exists(self.compacting_file)
+            ):
+                self._start_compaction()
+
+    def close(self):
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+
+    # -------------------------
+    # Compaction
+    # -------------------------
+
+    def _start_compaction(self):
+        os.replace(self.journal_file, self.compacting_file)
+        self._size = 0
+
+        self._compactor = threading.Thread(target=self._compact, daemon=True)
+        self._compactor.start()
+
+    def _compact(self):
+        """
+        Folds the rotated-out log into the snapshot. Appends only wait
+        for the final file swap, not for the replay or the encoding.
+        """
+        try:
+            data = read_snapshot(self.player_file)
+            if data is None:
+                data = new_player()
+
+            for record in read_journal(self.compacting_file):
+                apply_record(data, record)
+
+            snapshot = encode_player(data)
+
+            with self._lock:
+                # gone if a full save already superseded this log
+                if os.path.exists(self.compacting_file):
+                    self._write_snapshot(snapshot)
+        finally:
+            self._compactor = None
+
+    def _write_snapshot(self, snapshot):
+        _write_atomic(self.player_file, snapshot)
+        if os.path.exists(self.compacting_file):
+            os.remove(self.compacting_file)
+
+
+class SaveScheduler:
+    """
+    Write-behind saver. Every save inside operation() only marks the
+    state dirty; the outermost operation writes it once on exit.
+    Outside an operation, saves are written after `window` seconds,
+    or immediately when the window is 0.
+    """
+
+    def __init__(self, window=0.0, writer=None, lock=None):
+        self.window = window
+        self.writer = writer        # writer(data, events); default save_player
+
+        self.writes = 0             # physical writes, lifetime
+        self.operation_writes = 0   # physical writes in the last operation
+
+        self._data = None
+        self._events = []
+        self._dirty = False
+        self._depth = 0
+        self._timer = None
+        # shared with the owner when given, so timed flushes wait for it
+        self._lock = lock or threading.RLock()
+
+    def mark_dirty(self, data, event=None):
+        with self._lock:
+            self._data = data
+            self._dirty = True
+            if event:
+                self._events.append(event)
+
+            if self._depth == 0:
+                # a save outside any operation counts as one of its own
+                self.operation_writes = 0
+                self._write_or_schedule()
+
+    @contextmanager
+    def operation(self, event=None):
+        with self._lock:
+            if self._depth == 0:
+                self.operation_writes = 0
+            if event:
+                self._events.append(event)
+            self._depth += 1
+
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._depth -= 1
+                if self._depth == 0 and self._dirty:
+                    self._write_or_schedule()
 
+    def flush(self):
+        with self._lock:
+            self._cancel_timer()
 
-def load_player():
-    if not os.path.exists(PLAYER_FILE):
-        return DEFAULT_PLAYER.copy()
+            if not self._dirty:
+                self._events = []
+                return
 
-    with open(PLAYER_FILE, "r") as f:
-        data = json.load(f)
+            if self.writer is None:
+                save_player(self._data)
+            else:
+                self.writer(self._data, self._events)
 
-    # basic migration safety
-    for key, value in DEFAULT_PLAYER.items():
-        if key not in data:
-            data[key] = value
+            self._events = []
+            self._dirty = False
+            self.writes += 1
+            self.operation_writes += 1
 
-    return data
+    def _write_or_schedule(self):
+        if self.window <= 0:
+            self.flush()
+            return
 
+        if self._timer is None:
+            self._timer = threading.Timer(self.window, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
 
-def save_player(data):
-    with open(PLAYER_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
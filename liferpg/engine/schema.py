@@ -1,4 +1,6 @@
-SCHEMA_VERSION = 1
+import copy
+
+SCHEMA_VERSION = 2
 
 DEFAULT_PLAYER = {
     "schema_version": SCHEMA_VERSION,
@@ -21,3 +23,7 @@ DEFAULT_PLAYER = {
     "last_active_date": None,
     "last_emergency_repair_date": None
 }
+
+
+def new_player():
+    return copy.deepcopy(DEFAULT_PLAYER)
@@ -0,0 +1,211 @@
+import os
+import copy
+import json
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from .schema import new_player
+from .migrations import migrate
+from .save import SAVE_DIR, DEFAULT_PROFILE, diff_state, apply_record
+
+SQLITE_FILE = os.path.join(SAVE_DIR, "profiles.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS player_fields (
+    profile_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (profile_id, key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS player_quests (
+    profile_id TEXT NOT NULL,
+    quest_id TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (profile_id, quest_id)
+) WITHOUT ROWID;
+"""
+
+
+def _encode(value):
+    return json.dumps(value, separators=(",", ":"))
+
+
+# -------------------------
+# Connection Pool
+# -------------------------
+
+class ConnectionPool:
+    """
+    Up to `size` WAL connections shared between threads. Each borrower
+    gets a connection to itself, so readers never wait on the writer.
+    """
+
+    def __init__(self, path, size=8):
+        self.path = path
+        self.size = size
+
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+
+            conn = self._connect() if create else self._idle.get()
+
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+# -------------------------
+# Store
+# -------------------------
+
+class SqliteStore:
+    """
+    Many profiles in one SQLite database. Player fields and quests are
+    stored one row each, so a save only rewrites what changed.
+    """
+
+    def __init__(self, path=SQLITE_FILE, pool_size=8):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.pool = ConnectionPool(path, pool_size)
+
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def transaction(self, write=False):
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def load(self, profile_id=DEFAULT_PROFILE):
+        with self.transaction() as conn:
+            fields = conn.execute(
+                "SELECT key, value FROM player_fields WHERE profile_id = ?",
+                (profile_id,)
+            ).fetchall()
+            quests = conn.execute(
+                "SELECT quest_id, value FROM player_quests WHERE profile_id = ?",
+                (profile_id,)
+            ).fetchall()
+
+        if not fields:
+            return new_player()
+
+        data = {key: json.loads(value) for key, value in fields}
+        data["quests"] = {qid: json.loads(value) for qid, value in quests}
+
+        if migrate(data):
+            self.save(profile_id, data)
+
+        return data
+
+    def save(self, profile_id, data):
+        """
+        Replaces the whole profile.
+        """
+        with self.transaction(write=True) as conn:
+            conn.execute("DELETE FROM player_fields WHERE profile_id = ?", (profile_id,))
+            conn.execute("DELETE FROM player_quests WHERE profile_id = ?", (profile_id,))
+            self._write(conn, profile_id, diff_state({}, data))
+
+    def apply(self, profile_id, record):
+        """
+        Writes one diff_state() record in a single transaction.
+        """
+        with self.transaction(write=True) as conn:
+            self._write(conn, profile_id, record)
+
+    def _write(self, conn, profile_id, record):
+        conn.executemany(
+            "INSERT OR REPLACE INTO player_fields (profile_id, key, value) VALUES (?, ?, ?)",
+            [(profile_id, k, _encode(v)) for k, v in record.get("set", {}).items()]
+        )
+        conn.executemany(
+            "DELETE FROM player_fields WHERE profile_id = ? AND key = ?",
+            [(profile_id, k) for k in record.get("unset", [])]
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO player_quests (profile_id, quest_id, value) VALUES (?, ?, ?)",
+            [(profile_id, qid, _encode(q)) for qid, q in record.get("quests", {}).items()]
+        )
+        conn.executemany(
+            "DELETE FROM player_quests WHERE profile_id = ? AND quest_id = ?",
+            [(profile_id, qid) for qid in record.get("quests_removed", [])]
+        )
+
+    def exists(self, profile_id):
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM player_fields WHERE profile_id = ? LIMIT 1",
+                (profile_id,)
+            ).fetchone()
+        return row is not None
+
+    def open_writer(self, profile_id, data):
+        return SqliteWriter(self, profile_id, data)
+
+    def close(self):
+        self.pool.close()
+
+
+class SqliteWriter:
+    """
+    SaveScheduler writer for one profile: diffs against the last written
+    state and upserts only changed fields and quests.
+    """
+
+    def __init__(self, store, profile_id, data):
+        self.store = store
+        self.profile_id = profile_id
+        self._lock = threading.Lock()
+
+        # a brand-new profile has no rows yet, so its first write is in full
+        self._last = copy.deepcopy(data) if store.exists(profile_id) else {}
+
+    def append(self, data, events=()):
+        with self._lock:
+            record = diff_state(self._last, data, advance=False)
+            if record:
+                self.store.apply(self.profile_id, record)
+                # committed; a failed transaction is retried in full next time
+                apply_record(self._last, record)
+
+    def close(self):
+        pass
@@ -0,0 +1,107 @@
+import copy
+import queue
+import threading
+from .player import Player
+from .quest import Quest
+
+
+class Snapshot:
+    """
+    Detached copy of player state, safe to read from another thread.
+    """
+
+    def __init__(self, data, quests, revisions):
+        self.data = data
+        self.quests = quests
+        self.revisions = revisions
+
+
+class EngineWorker:
+    """
+    Owns the Player on a background thread. Callers submit commands by
+    Player method name, or as a callable taking the player first; after
+    each batch of commands the worker posts a Snapshot (or an error
+    message) to `results` for the UI to drain.
+    """
+
+    def __init__(self, player_factory=Player):
+        self.player_factory = player_factory
+        self.commands = queue.Queue()
+        self.results = queue.Queue()
+
+        self._quest_cache = {}
+        self._thread = threading.Thread(target=self._run, name="engine", daemon=True)
+        self._thread.start()
+
+    def submit(self, command, *args):
+        self.commands.put((command, args))
+
+    def stop(self, timeout=5.0):
+        self.commands.put(None)
+        self._thread.join(timeout)
+
+    # -------------------------
+    # Worker Thread
+    # -------------------------
+
+    def _run(self):
+        try:
+            self.player = self.player_factory()
+        except Exception as e:
+            self.results.put(("error", f"Failed to load player: {e}"))
+            return
+
+        self.results.put(("snapshot", self._snapshot()))
+
+        while True:
+            item = self.commands.get()
+            batch = [item]
+
+            # coalesce whatever queued up meanwhile into one snapshot
+            while item is not None:
+                try:
+                    item = self.commands.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            for item in batch:
+                if item is None:
+                    self.player.flush()
+                    return
+                self._execute(*item)
+
+            self.results.put(("snapshot", self._snapshot()))
+
+    def _execute(self, command, args):
+        try:
+            if callable(command):
+                command(self.player, *args)
+            else:
+                getattr(self.player, command)(*args)
+        except Exception as e:
+            name = getattr(command, "__name__", command)
+            self.results.put(("error", f"{name} failed: {e}"))
+
+    def _snapshot(self):
+        player = self.player
+        manager = player.quest_manager
+
+        data = copy.deepcopy({k: v for k, v in player.data.items() if k != "quests"})
+
+        # only re-copy quests whose revision moved since the last snapshot
+        cache = {}
+        for qid, quest in manager.quests.items():
+            revision = manager.revisions[qid]
+            cached = self._quest_cache.get(qid)
+            if cached is None or cached[0] != revision:
+                cached = (revision, Quest.from_dict(copy.deepcopy(quest.to_dict())))
+            cache[qid] = cached
+
+        self._quest_cache = cache
+
+        return Snapshot(
+            data,
+            {qid: quest for qid, (_, quest) in cache.items()},
+            {qid: revision for qid, (revision, _) in cache.items()}
+        )
@@ -0,0 +1,349 @@
+"""
+Headless JSON API over the engine, for serving many profiles from one
+process.
+
+    python -m liferpg.service.http_api --port 8080
+
+    GET  /profiles/<id>/player
+    GET  /profiles/<id>/quests
+    POST /profiles/<id>/complete_task   {"id": 1, "name": "...", "difficulty": "hard"}
+                                        or {"tasks": [{...}, ...]}
+    POST /profiles/<id>/fail_task       {"id": 1, "name": "...", "difficulty": "hard"}
+"""
+import json
+import asyncio
+import argparse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from liferpg.engine.player import Player
+from liferpg.engine.save import check_profile_id
+from liferpg.engine.task import Task
+
+MAX_PROFILES = 256
+WORKERS = 16
+MAX_BODY = 1024 * 1024
+HEADER_TIMEOUT = 60
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# -------------------------
+# Profile Cache
+# -------------------------
+
+class ProfileSlot:
+    def __init__(self):
+        self.player = None
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class ProfileCache:
+    """
+    LRU of loaded Players. Each profile has its own lock, so requests
+    for different profiles run concurrently on the worker threads while
+    requests for one profile run one at a time. Evicted players are
+    flushed before a later request may load them again.
+    """
+
+    def __init__(self, executor, capacity=MAX_PROFILES, player_factory=None):
+        self.executor = executor
+        self.capacity = capacity
+        self.player_factory = player_factory or (lambda pid: Player(profile_id=pid))
+
+        self.slots = OrderedDict()
+        self._flushing = {}
+
+    async def run(self, profile_id, fn):
+        """
+        Runs fn(player) on a worker thread while holding the profile lock.
+        """
+        slot = await self._acquire(profile_id)
+        loop = asyncio.get_running_loop()
+
+        try:
+            async with slot.lock:
+                if slot.player is None:
+                    slot.player = await loop.run_in_executor(
+                        self.executor, self.player_factory, profile_id
+                    )
+                return await loop.run_in_executor(self.executor, fn, slot.player)
+        finally:
+            slot.users -= 1
+
+    async def _acquire(self, profile_id):
+        # a just-evicted copy must reach disk before it is loaded again
+        flushing = self._flushing.get(profile_id)
+        if flushing is not None:
+            await asyncio.shield(flushing)
+
+        slot = self.slots.get(profile_id)
+        if slot is None:
+            slot = self.slots[profile_id] = ProfileSlot()
+        self.slots.move_to_end(profile_id)
+        slot.users += 1
+
+        self._evict()
+        return slot
+
+    def _evict(self):
+        for pid in list(self.slots):
+            if len(self.slots) <= self.capacity:
+                break
+
+            slot = self.slots[pid]
+            if slot.users:
+                continue
+
+            del self.slots[pid]
+            task = asyncio.ensure_future(self._flush(pid, slot))
+            self._flushing[pid] = task
+
+    async def _flush(self, profile_id, slot):
+        try:
+            async with slot.lock:
+                if slot.player is not None:
+                    await asyncio.get_running_loop().run_in_executor(
+                        self.executor, slot.player.flush
+                    )
+        finally:
+            self._flushing.pop(profile_id, None)
+
+    async def close(self):
+        for pid, slot in list(self.slots.items()):
+            del self.slots[pid]
+            self._flushing[pid] = asyncio.ensure_future(self._flush(pid, slot))
+
+        if self._flushing:
+            await asyncio.gather(*self._flushing.values())
+
+
+# -------------------------
+# Handlers
+# -------------------------
+
+DIFFICULTIES = ("easy", "medium", "hard", "boss")
+
+
+def parse_task(body):
+    if not isinstance(body, dict) or "id" not in body:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "task needs an id")
+
+    task_id, name = body["id"], body.get("name", "")
+    difficulty = body.get("difficulty", "easy")
+
+    if not isinstance(task_id, (str, int)) or isinstance(task_id, bool):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "task id must be a string or integer")
+    if not isinstance(name, str):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "task name must be a string")
+    if difficulty not in DIFFICULTIES:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"difficulty must be one of {', '.join(DIFFICULTIES)}")
+
+    return Task(task_id, name, difficulty)
+
+
+def encode(payload):
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def player_state(player):
+    return {k: v for k, v in player.data.items() if k != "quests"}
+
+
+def quest_state(player):
+    return {qid: quest.to_dict() for qid, quest in player.quest_manager.quests.items()}
+
+
+def complete_task(body):
+    if "tasks" in body:
+        if not isinstance(body["tasks"], list):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "tasks must be a list")
+        tasks = [parse_task(item) for item in body["tasks"]]
+
+        def run(player):
+            player.complete_tasks(tasks)
+            return player_state(player)
+    else:
+        task = parse_task(body)
+
+        def run(player):
+            player.complete_task(task)
+            return player_state(player)
+
+    return run
+
+
+def fail_task(body):
+    task = parse_task(body)
+
+    def run(player):
+        player.fail_task(task)
+        return player_state(player)
+
+    return run
+
+
+ROUTES = {
+    ("GET", "player"): lambda body: player_state,
+    ("GET", "quests"): lambda body: quest_state,
+    ("POST", "complete_task"): complete_task,
+    ("POST", "fail_task"): fail_task,
+}
+
+
+# -------------------------
+# HTTP
+# -------------------------
+
+class ApiServer:
+    """
+    Minimal HTTP/1.1 (keep-alive, Content-Length bodies only) on asyncio
+    streams; the engine itself runs on a thread pool.
+    """
+
+    def __init__(self, capacity=MAX_PROFILES, workers=WORKERS, player_factory=None):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="engine")
+        self.cache = ProfileCache(self.executor, capacity, player_factory)
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=8080):
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        await self.cache.close()
+        self.executor.shutdown(wait=True)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self.read_request(reader), HEADER_TIMEOUT)
+                except HttpError as e:
+                    await self.respond(writer, e.status, encode({"error": str(e)}), keep_alive=False)
+                    return
+
+                if request is None:
+                    return
+
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+
+                try:
+                    status, payload = HTTPStatus.OK, await self.dispatch(method, path, body)
+                except HttpError as e:
+                    status, payload = e.status, encode({"error": str(e)})
+                except Exception as e:
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, encode({"error": str(e)})
+
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    return
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+
+        try:
+            method, target, _ = line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "malformed request line")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = headers.get("content-length") or "0"
+        if not length.isdigit():
+            raise HttpError(HTTPStatus.BAD_REQUEST, "invalid Content-Length")
+
+        length = int(length)
+        if length > MAX_BODY:
+            raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "body too large")
+
+        body = await reader.readexactly(length) if length else b""
+        return method, target.split("?", 1)[0], headers, body
+
+    async def dispatch(self, method, path, raw):
+        parts = path.strip("/").split("/")
+        if len(parts) != 3 or parts[0] != "profiles":
+            raise HttpError(HTTPStatus.NOT_FOUND, "not found")
+
+        _, profile_id, action = parts
+        route = ROUTES.get((method, action))
+        if route is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, "not found")
+
+        try:
+            check_profile_id(profile_id)
+            body = json.loads(raw) if raw else {}
+        except ValueError as e:
+            raise HttpError(HTTPStatus.BAD_REQUEST, str(e))
+
+        if not isinstance(body, dict):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "body must be a JSON object")
+
+        handler = route(body)
+
+        # encoded on the worker while the profile lock is held; the state
+        # views share dicts with the player, which the next request for
+        # this profile may change as soon as the lock is released
+        return await self.cache.run(profile_id, lambda player: encode(handler(player)))
+
+    async def respond(self, writer, status, body, keep_alive=True):
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+async def serve(host, port, capacity, workers):
+    api = ApiServer(capacity, workers)
+    server = await api.start(host, port)
+    print(f"LifeRPG API listening on http://{host}:{port}")
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await api.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LifeRPG JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--profiles", type=int, default=MAX_PROFILES, help="players kept loaded")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.profiles, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,240 @@
 import tkinter as tk
 from tkinter import ttk
 import json
+import os
+import queue
+import time
+from collections import deque
 
-from liferpg.engine.player import Player
 from liferpg.engine.task import Task
+from liferpg.engine.worker import EngineWorker
+
+
+class QuestView:
+    """
+    Retained widgets for one quest. update() only reconfigures
+    widgets whose text or style actually changed.
+    """
+
+    def __init__(self, parent):
+        self.frame = tk.Frame(parent, bg="#0f1117")
+        self.frame.pack(fill="x", anchor="w")
+
+        self.name = ttk.Label(self.frame, style="Header.TLabel")
+        self.name.pack(anchor="w", pady=(5, 2))
+
+        self.objectives = []
+
+        self.status = ttk.Label(self.frame)
+        self.status.pack(anchor="w", pady=(5, 5))
+
+        self.reward = ttk.Label(self.frame, style="Normal.TLabel")
+        self.reward.pack(anchor="w", pady=(0, 10))
+
+        self.revision = None
+        self._shown = {}
+
+    def _set(self, key, widget, **options):
+        if self._shown.get(key) != options:
+            widget.config(**options)
+            self._shown[key] = options
+
+    def update(self, quest, revision):
+        if revision == self.revision:
+            return
+        self.revision = revision
+
+        self._set("name", self.name, text=quest.name)
+
+        while len(self.objectives) < len(quest.objectives):
+            label = ttk.Label(self.frame, style="Normal.TLabel")
+            label.pack(anchor="w", before=self.status)
+            self.objectives.append(label)
+
+        while len(self.objectives) > len(quest.objectives):
+            self.objectives.pop().destroy()
+            self._shown.pop(("obj", len(self.objectives)), None)
+
+        for i, (label, obj) in enumerate(zip(self.objectives, quest.objectives)):
+            percent = obj.current / obj.target
+            bar = "█" * int(percent * 10)
+            bar += "░" * (10 - len(bar))
+
+            line = f"▸ {obj.type.replace('_',' ').title():<25} {obj.current}/{obj.target:<5} {bar}"
+            self._set(("obj", i), label, text=line)
+
+        style_name = "Completed.TLabel" if quest.status == "completed" else "Active.TLabel"
+        self._set("status", self.status,
+                  text=f"STATUS: {quest.status.upper()}", style=style_name)
+
+        rewards = " | ".join(
+            [f"+{v} {k.upper()}" for k, v in quest.rewards.items()
+             if not k.startswith("_")]
+        )
+        self._set("reward", self.reward, text=f"REWARD: {rewards}")
+
+    def destroy(self):
+        self.frame.destroy()
+
+
+class TaskList(ttk.Frame):
+    """
+    Virtualized task list. Only `rows` Treeview items ever exist; they are
+    rebound to whichever slice of the filtered tasks is scrolled into view.
+    """
+
+    DIFFICULTIES = ("all", "easy", "medium", "hard", "boss")
+
+    def __init__(self, parent, on_complete, rows=8):
+        super().__init__(parent)
+
+        self.on_complete = on_complete
+        self.rows = rows
+        self.tasks = []
+        self.filtered = []
+        self.offset = 0
+        self.selected_id = None
+
+        bar = ttk.Frame(self)
+        bar.pack(fill="x", pady=(0, 4))
+
+        ttk.Label(bar, text="Difficulty", style="Normal.TLabel").pack(side="left")
+
+        self.difficulty = tk.StringVar(value="all")
+        ttk.Combobox(
+            bar,
+            textvariable=self.difficulty,
+            values=self.DIFFICULTIES,
+            state="readonly",
+            width=8
+        ).pack(side="left", padx=5)
+        self.difficulty.trace_add("write", lambda *_: self.apply_filter())
+
+        self.count_label = ttk.Label(bar, style="Normal.TLabel")
+        self.count_label.pack(side="left", padx=10)
+
+        ttk.Button(
+            bar,
+            text="Complete",
+            command=self.complete_selected
+        ).pack(side="right")
+
+        body = ttk.Frame(self)
+        body.pack(fill="both", expand=True)
+
+        self.tree = ttk.Treeview(
+            body,
+            columns=("name", "difficulty"),
+            show="headings",
+            height=rows,
+            selectmode="browse"
+        )
+        self.tree.heading("name", text="Task")
+        self.tree.heading("difficulty", text="Difficulty")
+        self.tree.column("name", width=520)
+        self.tree.column("difficulty", width=120, anchor="center")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.scrollbar = ttk.Scrollbar(body, orient="vertical", command=self.on_scroll)
+        self.scrollbar.pack(side="right", fill="y")
+
+        for i in range(rows):
+            self.tree.insert("", "end", iid=str(i), values=("", ""))
+
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        self.tree.bind("<Double-1>", lambda e: self.complete_selected())
+        self.tree.bind("<MouseWheel>", self.on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll_by(-1))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_by(1))
+
+    # -------------------------
+    # Data
+    # -------------------------
+
+    def set_tasks(self, tasks):
+        self.tasks = list(tasks)
+        self.apply_filter(keep_offset=True)
+
+    def apply_filter(self, keep_offset=False):
+        difficulty = self.difficulty.get()
+
+        if difficulty == "all":
+            self.filtered = self.tasks
+        else:
+            self.filtered = [t for t in self.tasks if t.difficulty == difficulty]
+
+        if not keep_offset:
+            self.offset = 0
+
+        self.count_label.config(text=f"{len(self.filtered)} tasks")
+        self.render()
+
+    # -------------------------
+    # Viewport
+    # -------------------------
+
+    def render(self):
+        total = len(self.filtered)
+        self.offset = max(0, min(self.offset, total - self.rows))
+        visible = self.filtered[self.offset:self.offset + self.rows]
+
+        selected = None
+
+        for i in range(self.rows):
+            iid = str(i)
+
+            if i < len(visible):
+                task = visible[i]
+                self.tree.item(iid, values=(task.name, task.difficulty))
+                self.tree.move(iid, "", i)
+                if task.id == self.selected_id:
+                    selected = iid
+            else:
+                self.tree.detach(iid)
+
+        if selected:
+            self.tree.selection_set(selected)
+        elif self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+
+        if total:
+            self.scrollbar.set(self.offset / total, (self.offset + len(visible)) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def visible_task(self, iid):
+        index = self.offset + int(iid)
+        return self.filtered[index] if index < len(self.filtered) else None
+
+    def scroll_by(self, rows):
+        self.offset += rows
+        self.render()
+
+    def on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.offset = int(float(amount) * len(self.filtered))
+            self.render()
+        elif unit == "pages":
+            self.scroll_by(int(amount) * self.rows)
+        else:
+            self.scroll_by(int(amount))
+
+    def on_wheel(self, event):
+        self.scroll_by(-1 if event.delta > 0 else 1)
+
+    # -------------------------
+    # Actions
+    # -------------------------
+
+    def on_select(self, event=None):
+        selection = self.tree.selection()
+        task = self.visible_task(selection[0]) if selection else None
+        if task is not None:
+            self.selected_id = task.id
+
+    def complete_selected(self):
+        if self.selected_id is not None:
+            self.on_complete(self.selected_id)
 
 
 class LifeRPGApp(tk.Tk):
@@ -15,10 +246,15 @@ class LifeRPGApp(tk.Tk):
         self.geometry("900x750")
         self.configure(bg="#0f1117")
 
-        self.player = Player()
+        # Player lives on the engine thread; widgets only read snapshots
+        self.engine = EngineWorker()
+        self.snapshot = None
         self.console_visible = False
         self.dev_mode = False
 
+        self.quest_views = {}
+        self.refresh_times = deque(maxlen=100)
+
         self.tasks = [
             Task(1, "Calibrate Navigation Systems", "easy"),
             Task(2, "Repair External Hull Plating", "medium"),
@@ -26,10 +262,79 @@ class LifeRPGApp(tk.Tk):
             Task(4, "Deep Space Boss Encounter", "boss"),
         ]
 
+        self.tasks_by_id = {task.id: task for task in self.tasks}
+
         self.build_ui()
-        self.refresh_ui()
+        self.task_list.set_tasks(self.tasks)
+
+        self.poller = None
+        # ids of the TickTick tasks last posted by the poller
+        self.ticktick_ids = set()
+        if os.environ.get("TICKTICK_TOKEN"):
+            self.start_ticktick(os.environ["TICKTICK_TOKEN"])
+
+        self.poll_engine()
 
         self.bind_all("<F12>", self.toggle_console)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def start_ticktick(self, token):
+        from api_ticktick import TickTickClient, TickTickPoller, TokenBucket
+
+        client = TickTickClient(token, limiter=TokenBucket())
+        self.poller = TickTickPoller(client, self.engine)
+        self.poller.start()
+
+    def on_close(self):
+        # stop the poller first so nothing is submitted to a stopped engine
+        if self.poller is not None:
+            self.poller.stop()
+        self.engine.stop()
+        self.destroy()
+
+    def poll_engine(self):
+        """
+        Drains engine results on the Tk thread; refreshes once per drain.
+        """
+        snapshot = None
+
+        while True:
+            try:
+                kind, payload = self.engine.results.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "snapshot":
+                snapshot = payload
+            else:
+                self.print_console(payload)
+
+        if snapshot is not None:
+            self.snapshot = snapshot
+            self.refresh_ui()
+
+        if self.poller is not None:
+            self.poll_ticktick()
+
+        self.after(50, self.poll_engine)
+
+    def poll_ticktick(self):
+        tasks = None
+
+        while True:
+            try:
+                kind, payload = self.poller.updates.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "tasks":
+                tasks = payload
+            else:
+                self.print_console(payload)
+
+        if tasks is not None:
+            self.ticktick_ids = {task.id for task in tasks}
+            self.set_tasks(tasks)
 
     # ======================================================
     # UI BUILD
@@ -97,22 +402,8 @@ class LifeRPGApp(tk.Tk):
         # TASK PANEL
         # =========================
 
-        self.task_frame = ttk.Frame(self)
-        self.task_frame.pack(pady=10)
-
-        for task in self.tasks:
-            frame = ttk.Frame(self.task_frame)
-            frame.pack(fill="x", pady=4)
-
-            ttk.Label(frame,
-                      text=f"{task.name} ({task.difficulty})",
-                      style="Normal.TLabel").pack(side="left")
-
-            ttk.Button(
-                frame,
-                text="Complete",
-                command=lambda t=task: self.complete_task(t)
-            ).pack(side="right")
+        self.task_list = TaskList(self, on_complete=self.complete_task_by_id)
+        self.task_list.pack(fill="x", padx=40, pady=10)
 
         ttk.Separator(self, orient="horizontal").pack(fill="x", pady=20)
 
@@ -204,19 +495,19 @@ class LifeRPGApp(tk.Tk):
             ttk.Button(
                 self.dev_overlay,
                 text="+100 XP",
-                command=lambda: self.player.dev_add_xp(100)
+                command=lambda: self.engine.submit("dev_add_xp", 100)
             ).pack(side="left", padx=5)
 
             ttk.Button(
                 self.dev_overlay,
                 text="+500 Credits",
-                command=lambda: self.player.dev_add_credits(500)
+                command=lambda: self.engine.submit("dev_add_credits", 500)
             ).pack(side="left", padx=5)
 
             ttk.Button(
                 self.dev_overlay,
                 text="Force Failure",
-                command=self.player.critical_failure
+                command=lambda: self.engine.submit("critical_failure")
             ).pack(side="left", padx=5)
 
         else:
@@ -228,56 +519,38 @@ class LifeRPGApp(tk.Tk):
     # ======================================================
 
     def complete_task(self, task):
-        self.player.complete_task(task)
-        self.refresh_ui()
+        if task.id in self.ticktick_ids:
+            # TickTick task: rewarded once, then pushed back through the outbox
+            self.engine.submit(self.poller.complete, task)
+        else:
+            self.engine.submit("complete_task", task)
+
+    def complete_task_by_id(self, task_id):
+        task = self.tasks_by_id.get(task_id)
+        if task is not None:
+            self.complete_task(task)
+
+    def set_tasks(self, tasks):
+        self.tasks = list(tasks)
+        self.tasks_by_id = {task.id: task for task in self.tasks}
+        self.task_list.set_tasks(self.tasks)
 
     # ======================================================
     # QUEST RENDERING
     # ======================================================
 
     def render_quests(self):
-        for widget in self.quest_content.winfo_children():
-            widget.destroy()
-
-        for quest in self.player.quest_manager.quests.values():
-
-            ttk.Label(
-                self.quest_content,
-                text=quest.name,
-                style="Header.TLabel"
-            ).pack(anchor="w", pady=(5, 2))
-
-            for obj in quest.objectives:
-                percent = obj.current / obj.target
-                bar = "█" * int(percent * 10)
-                bar += "░" * (10 - len(bar))
+        quests = self.snapshot.quests
 
-                line = f"▸ {obj.type.replace('_',' ').title():<25} {obj.current}/{obj.target:<5} {bar}"
+        for qid in [qid for qid in self.quest_views if qid not in quests]:
+            self.quest_views.pop(qid).destroy()
 
-                ttk.Label(
-                    self.quest_content,
-                    text=line,
-                    style="Normal.TLabel"
-                ).pack(anchor="w")
+        for qid, quest in quests.items():
+            view = self.quest_views.get(qid)
+            if view is None:
+                view = self.quest_views[qid] = QuestView(self.quest_content)
 
-            style_name = "Completed.TLabel" if quest.status == "completed" else "Active.TLabel"
-
-            ttk.Label(
-                self.quest_content,
-                text=f"STATUS: {quest.status.upper()}",
-                style=style_name
-            ).pack(anchor="w", pady=(5, 5))
-
-            rewards = " | ".join(
-                [f"+{v} {k.upper()}" for k, v in quest.rewards.items()
-                 if not k.startswith("_")]
-            )
-
-            ttk.Label(
-                self.quest_content,
-                text=f"REWARD: {rewards}",
-                style="Normal.TLabel"
-            ).pack(anchor="w", pady=(0, 10))
+            view.update(quest, self.snapshot.revisions[qid])
 
     # ======================================================
     # DEV CONSOLE
@@ -303,7 +576,9 @@ class LifeRPGApp(tk.Tk):
         try:
             parts = cmd.split()
             if parts and parts[0] == "add_xp":
-                self.player.dev_add_xp(int(parts[1]))
+                self.engine.submit("dev_add_xp", int(parts[1]))
+            elif parts and parts[0] == "perf":
+                self.print_refresh_stats()
             else:
                 self.print_console("Unknown command")
 
@@ -312,6 +587,18 @@ class LifeRPGApp(tk.Tk):
 
         self.refresh_ui()
 
+    def print_refresh_stats(self):
+        if not self.refresh_times:
+            self.print_console("No refresh timings yet")
+            return
+
+        times = sorted(self.refresh_times)
+        self.print_console(
+            f"refresh_ui over {len(times)} runs, {len(self.quest_views)} quests: "
+            f"last {self.refresh_times[-1]:.2f} ms, "
+            f"median {times[len(times) // 2]:.2f} ms, max {times[-1]:.2f} ms"
+        )
+
     def print_console(self, text):
         self.console_output.insert("end", text + "\n")
         self.console_output.see("end")
@@ -321,7 +608,11 @@ class LifeRPGApp(tk.Tk):
     # ======================================================
 
     def refresh_ui(self):
-        data = self.player.data
+        if self.snapshot is None:
+            return
+
+        started = time.perf_counter()
+        data = self.snapshot.data
 
         self.rank_label.config(text=f"RANK: {data['rank']}")
         self.nav_label.config(
@@ -332,3 +623,5 @@ class LifeRPGApp(tk.Tk):
         self.progress["value"] = data["current_navigation_data"]
 
         self.render_quests()
+
+        self.refresh_times.append((time.perf_counter() - started) * 1000)